@@ -0,0 +1,156 @@
+# src/batch.py
+"""
+Headless batch mode: counts reps in recorded videos without opening the UI.
+
+    python src/batch.py recordings/ --exercise Squats --reps 10 --workers 4
+
+Each video is processed in its own worker process with its own PoseDetector,
+and the per-set counts are written in the same schema as logs/session_log.csv.
+Landmark traces recorded with `main.py --record-trace` are accepted too; they are
+replayed straight into the exercise logic without the camera or MediaPipe.
+An input that fails is reported and skipped; the exit code is 1 if any did.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from exercises.registry import EXERCISES
+from exercises.sets import SetSplitter
+from storage.session_log import append_session_log, TIMESTAMP_FORMAT
+from tracker.detector_options import add_detector_arguments, detector_options
+from tracker.filters import make_filter
+from tracker.trace import TraceReader, is_trace, replay
+
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv', '.webm', '.m4v')
+
+
+def collect_inputs(paths):
+    """Expands the given files/directories into a sorted list of video files and trace directories."""
+    inputs = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                if is_trace(root):
+                    inputs.append(root); dirs[:] = []
+                    continue
+                inputs.extend(os.path.join(root, f) for f in files if f.lower().endswith(VIDEO_EXTENSIONS))
+        else:
+            inputs.append(path)
+    return sorted(inputs)
+
+
+def count_video(path, exercise_name, reps_per_set=0, flip=True, detector_options=None, smoothing=None):
+    """
+    Runs the pose detector and one exercise state machine over a video file.
+    Returns a dict with the per-set rep counts and throughput figures.
+    Runs inside a worker process, so it builds its own PoseDetector (with `detector_options` as kwargs)
+    and its own landmark filter (`smoothing` is a tracker.filters name).
+    """
+    import cv2
+    from tracker.pose_detector import PoseDetector
+
+    detector = PoseDetector(**(detector_options or {}))
+    landmark_filter = make_filter(smoothing)
+    splitter = SetSplitter(EXERCISES[exercise_name](), reps_per_set)
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        return {"path": path, "error": "could not open video", "sets": [], "frames": 0, "seconds": 0.0}
+    frames = 0
+    start = time.perf_counter()
+    try:
+        while True:
+            success, frame = cap.read()
+            if not success: break
+            frames += 1
+            if flip:
+                frame = cv2.flip(frame, 1)
+            detector.find_pose(frame, draw=False)
+            landmarks = detector.get_landmarks(frame)
+            if landmarks is not None:
+                timestamp = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000
+                if landmark_filter: landmarks = landmark_filter(landmarks, timestamp)
+                splitter.exercise.process_landmarks(landmarks, timestamp)
+                splitter.update()
+    finally:
+        cap.release()
+    return {"path": path, "error": None, "sets": splitter.finish(), "frames": frames,
+            "seconds": time.perf_counter() - start}
+
+
+def count_trace(path, exercise_name, reps_per_set=0, smoothing=None):
+    """Replays a recorded landmark trace through one exercise state machine; same result shape as count_video."""
+    reader = TraceReader(path)
+    splitter = SetSplitter(EXERCISES[exercise_name](), reps_per_set)
+    start = time.perf_counter()
+    replay(reader, splitter.exercise, on_frame=lambda exercise: splitter.update(), landmark_filter=make_filter(smoothing))
+    return {"path": path, "error": None, "sets": splitter.finish(), "frames": len(reader),
+            "seconds": time.perf_counter() - start}
+
+
+def count_input(path, exercise_name, reps_per_set=0, flip=True, detector_options=None, smoothing=None):
+    if is_trace(path):
+        return count_trace(path, exercise_name, reps_per_set, smoothing)
+    return count_video(path, exercise_name, reps_per_set, flip, detector_options, smoothing)
+
+
+def to_log_rows(result, exercise_name):
+    """Converts a count_video result into session-log rows, stamped with the video's modification time."""
+    stamp = datetime.fromtimestamp(os.path.getmtime(result["path"])).strftime(TIMESTAMP_FORMAT)
+    return [{"Timestamp": stamp, "Exercise": exercise_name, "Set": i, "Reps": reps}
+            for i, reps in enumerate(result["sets"], start=1)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Count reps in recorded videos without the UI.")
+    parser.add_argument("paths", nargs="+", help="video files, landmark traces, or directories of either")
+    parser.add_argument("--exercise", required=True, choices=sorted(EXERCISES))
+    parser.add_argument("--reps", type=int, default=0, help="reps per set; 0 logs each video as a single set")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes (default: all cores)")
+    parser.add_argument("--output", default=os.path.join('logs', 'batch_session_log.csv'), help="CSV log to append to")
+    parser.add_argument("--no-flip", action="store_true", help="don't mirror frames (the live app mirrors the webcam)")
+    add_detector_arguments(parser)
+    args = parser.parse_args(argv)
+
+    inputs = collect_inputs(args.paths)
+    if not inputs:
+        print("No videos or traces found.", file=sys.stderr)
+        return 1
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max(1, min(args.workers, len(inputs)))) as pool:
+        futures = [pool.submit(count_input, v, args.exercise, args.reps, not args.no_flip,
+                               detector_options(args), args.smoothing) for v in inputs]
+        results = []
+        for path, future in zip(inputs, futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                # One bad clip (or a crashed worker) must not cost the rest of the batch
+                results.append({"path": path, "error": f"{type(e).__name__}: {e}", "sets": [], "frames": 0,
+                                "seconds": 0.0})
+    elapsed = time.perf_counter() - start
+
+    rows = []
+    total_frames = 0
+    failed = 0
+    for result in results:
+        total_frames += result["frames"]
+        if result["error"]:
+            failed += 1
+            print(f"{result['path']}: {result['error']}", file=sys.stderr)
+            continue
+        fps = result["frames"] / result["seconds"] if result["seconds"] else 0.0
+        print(f"{result['path']}: sets {result['sets']} ({result['frames']} frames, {fps:.1f} FPS)")
+        rows.extend(to_log_rows(result, args.exercise))
+    append_session_log(rows, args.output)
+    print(f"Processed {len(inputs)} inputs, {total_frames} frames in {elapsed:.1f}s "
+          f"({total_frames / elapsed if elapsed else 0.0:.1f} FPS overall). Log: {args.output}")
+    if failed: print(f"{failed} of {len(inputs)} inputs failed (see above).", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,262 @@
+# src/bench.py
+"""
+Per-stage benchmark for the frame pipeline.
+
+    python src/bench.py --frames 300                       # synthetic clip
+    python src/bench.py --video clip.mp4 --save-baseline bench_baseline.json
+    python src/bench.py --video clip.mp4 --baseline bench_baseline.json --threshold 0.15
+
+Each stage of the per-frame path is timed on its own and reported as p50/p95/p99
+and frames per second. With --baseline, any stage slower than the baseline by more
+than its threshold is reported as a regression and the exit code is 1.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from exercises.registry import EXERCISES, create_exercises
+from perf.stats import summarize
+from tracker.detector_options import add_detector_arguments, detector_options
+from tracker.filters import FILTERS
+from tracker.overlay import OVERLAY_MODES, SkeletonOverlay
+from tracker.synthetic import synthetic_frames, synthetic_landmarks
+
+DEFAULT_METRIC = "p95_ms"
+
+
+def load_clip(video, frames, size):
+    """Returns a list of BGR frames: the first `frames` of `video`, or a synthetic clip."""
+    if not video:
+        return list(synthetic_frames(frames, size))
+    cap = cv2.VideoCapture(video)
+    clip = []
+    while len(clip) < frames:
+        success, frame = cap.read()
+        if not success: break
+        clip.append(frame)
+    cap.release()
+    if not clip:
+        raise SystemExit(f"Could not read any frames from {video}")
+    return clip
+
+
+def time_call(samples, fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    samples.append(time.perf_counter() - start)
+    return result
+
+
+def bench_pipeline(clip, detector):
+    """Times the capture-side stages of the live loop frame by frame, in the same order the app runs them."""
+    samples = {name: [] for name in ("flip", "bgr_to_rgb", "pose_process", "draw_landmarks", "get_landmarks",
+                                     "overlay_draw")}
+    overlay = SkeletonOverlay("full")
+    for frame in clip:
+        frame = time_call(samples["flip"], cv2.flip, frame, 1)
+        img_rgb = time_call(samples["bgr_to_rgb"], cv2.cvtColor, frame, cv2.COLOR_BGR2RGB)
+        results = time_call(samples["pose_process"], detector.pose.process, img_rgb)
+        detector.results = results
+        if results.pose_landmarks:
+            time_call(samples["draw_landmarks"], detector.mp_draw.draw_landmarks,
+                      frame, results.pose_landmarks, detector.mp_pose.POSE_CONNECTIONS)
+            landmarks = time_call(samples["get_landmarks"], detector.get_landmarks, frame)
+            # The same skeleton, drawn by tracker.overlay from the landmark array instead of MediaPipe's utility
+            time_call(samples["overlay_draw"], overlay.draw, frame, landmarks)
+    return samples
+
+
+def bench_find_pose(clip, detector):
+    """Times PoseDetector.find_pose end to end (honours inference_width / roi) and counts detections."""
+    samples = {"find_pose": []}
+    detected = 0
+    for frame in clip:
+        time_call(samples["find_pose"], detector.find_pose, cv2.flip(frame, 1), False)
+        detected += bool(detector.results.pose_landmarks)
+    return samples, detected
+
+
+def bench_exercises(landmark_stack):
+    """Times every registered exercise's process_landmarks over a landmark stack, then the shared all-exercise engine."""
+    samples = {}
+    for name, factory in EXERCISES.items():
+        exercise = factory()
+        stage = samples[f"process_landmarks[{name}]"] = []
+        for i, landmarks in enumerate(landmark_stack):
+            time_call(stage, exercise.process_landmarks, landmarks, i / 30)
+    engine = next(iter(create_exercises().values())).engine
+    stage = samples[f"engine[{len(engine.names)} exercises]"] = []
+    for i, landmarks in enumerate(landmark_stack):
+        time_call(stage, engine.process, landmarks, i / 30)
+    return samples
+
+
+def bench_filters(landmark_stack):
+    """Times each landmark smoothing filter (tracker.filters) over a landmark stack."""
+    samples = {}
+    for name, filter_cls in FILTERS.items():
+        landmark_filter = filter_cls()
+        stage = samples[f"filter[{name}]"] = []
+        for i, landmarks in enumerate(landmark_stack):
+            time_call(stage, landmark_filter, landmarks, i / 30)
+    return samples
+
+
+def bench_overlay(clip, landmark_stack):
+    """Times every tracker.overlay mode drawing a landmark stack onto the clip, with all exercises' joints selected."""
+    joints = np.concatenate([exercise.joints for exercise in create_exercises().values()])
+    samples = {}
+    for mode in OVERLAY_MODES:
+        if mode == "off": continue
+        overlay = SkeletonOverlay(mode)
+        overlay.set_joints(joints)
+        stage = samples[f"overlay[{mode}]"] = []
+        for i, landmarks in enumerate(landmark_stack):
+            time_call(stage, overlay.draw, clip[i % len(clip)].copy(), landmarks)
+    return samples
+
+
+def bench_display(clip, display_size=(800, 560)):
+    """
+    Times the WorkoutScreen render path (ui.video_renderer.VideoRenderer): scaling the RGB frame into
+    the persistent buffer, loading it into the persistent PIL image and pasting into the PhotoImage.
+    """
+    from PIL import Image
+    samples = {"display_scale": [], "image_frombytes": [], "photoimage_paste": []}
+    try:
+        import tkinter as tk
+        from PIL import ImageTk
+        root = tk.Tk()
+        root.withdraw()
+    except Exception as e:  # No display (CI, SSH) - time what we can without Tk
+        print(f"note: PhotoImage stage skipped ({e})", file=sys.stderr)
+        root = None
+    h, w = clip[0].shape[:2]
+    scale = min(display_size[0] / w, display_size[1] / h)
+    size = (int(w * scale), int(h * scale))
+    interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR
+    buffer = np.empty((size[1], size[0], 3), dtype=np.uint8)
+    image = Image.new("RGB", size)
+    photo = ImageTk.PhotoImage(image=image) if root is not None else None
+    try:
+        for frame in clip:
+            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            time_call(samples["display_scale"], lambda: cv2.resize(rgb, size, dst=buffer, interpolation=interpolation))
+            time_call(samples["image_frombytes"], image.frombytes, buffer)
+            if photo is not None:
+                time_call(samples["photoimage_paste"], photo.paste, image)
+    finally:
+        if root is not None: root.destroy()
+    return samples
+
+
+def run(args):
+    size = (args.width, args.height)
+    clip = load_clip(args.video, args.frames, size)
+    samples = {}
+    meta = {"video": args.video or "synthetic", "frames": len(clip), "frame_size": list(clip[0].shape[1::-1]),
+            "detector": detector_options(args), "python": platform.python_version(), "machine": platform.machine(),
+            "created": time.strftime("%Y-%m-%d %H:%M:%S")}
+    if not args.skip_pose:
+        from tracker.pose_detector import PoseDetector
+        detector = PoseDetector()
+        bench_pipeline(clip[:args.warmup], detector)
+        samples.update(bench_pipeline(clip, detector))
+        # find_pose as configured for the live app, e.g. with --inference-width / --roi
+        detector = PoseDetector(**detector_options(args))
+        bench_find_pose(clip[:args.warmup], detector)
+        find_pose_samples, detected = bench_find_pose(clip, detector)
+        samples.update(find_pose_samples)
+        meta["detection_rate"] = detected / len(clip)
+        if detector.keyframes: meta["keyframe_ratio"] = detector.keyframes.stats()["keyframe_ratio"]
+    landmark_stack = synthetic_landmarks(max(args.frames, 600), size)
+    samples.update(bench_filters(landmark_stack))
+    samples.update(bench_exercises(landmark_stack))
+    samples.update(bench_overlay(clip, landmark_stack))
+    samples.update(bench_display(clip))
+    stages = {name: summarize(s) for name, s in samples.items() if s}
+    skipped = sorted(name for name, s in samples.items() if not s)
+    return {
+        "meta": meta,
+        "stages": stages,
+        "skipped": skipped,
+    }
+
+
+def print_report(report):
+    print(f"{'stage':<32}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'FPS':>10}")
+    for name, s in report["stages"].items():
+        print(f"{name:<32}{s['p50_ms']:>10.3f}{s['p95_ms']:>10.3f}{s['p99_ms']:>10.3f}{s['fps']:>10.1f}")
+    for name in report["skipped"]:
+        print(f"{name:<32}{'(no samples)':>40}")
+
+
+def find_regressions(report, baseline, threshold, stage_thresholds, metric=DEFAULT_METRIC):
+    """Returns (stage, baseline, current, allowed) for every stage whose `metric` grew past its threshold."""
+    regressions = []
+    for name, base in baseline.get("stages", {}).items():
+        current = report["stages"].get(name)
+        if current is None or not base.get(metric): continue
+        allowed = base[metric] * (1 + stage_thresholds.get(name, threshold))
+        if current[metric] > allowed:
+            regressions.append((name, base[metric], current[metric], allowed))
+    return regressions
+
+
+def parse_stage_thresholds(values):
+    thresholds = {}
+    for value in values:
+        name, _, fraction = value.rpartition("=")
+        if not name:
+            raise SystemExit(f"--stage-threshold expects STAGE=FRACTION, got {value!r}")
+        thresholds[name] = float(fraction)
+    return thresholds
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Per-stage frame pipeline benchmark.")
+    parser.add_argument("--video", help="clip to benchmark (default: bundled synthetic clip)")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--warmup", type=int, default=10, help="frames run before timing starts")
+    parser.add_argument("--width", type=int, default=640, help="synthetic clip width")
+    parser.add_argument("--height", type=int, default=480, help="synthetic clip height")
+    parser.add_argument("--skip-pose", action="store_true", help="skip the MediaPipe stages")
+    add_detector_arguments(parser)
+    parser.add_argument("--output", help="write the full JSON report here")
+    parser.add_argument("--save-baseline", metavar="PATH", help="write this run as the new baseline")
+    parser.add_argument("--baseline", metavar="PATH", help="compare against this baseline")
+    parser.add_argument("--metric", default=DEFAULT_METRIC, choices=("p50_ms", "p95_ms", "p99_ms", "mean_ms"))
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="allowed slowdown as a fraction of the baseline (default 0.15 = 15%%)")
+    parser.add_argument("--stage-threshold", action="append", default=[], metavar="STAGE=FRACTION",
+                        help="per-stage override, e.g. pose_process=0.3 (repeatable)")
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    print_report(report)
+    for path in (args.output, args.save_baseline):
+        if path:
+            if os.path.dirname(path): os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w') as f: json.dump(report, f, indent=2)
+    if not args.baseline:
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = find_regressions(report, baseline, args.threshold,
+                                   parse_stage_thresholds(args.stage_threshold), args.metric)
+    for name, base, current, allowed in regressions:
+        print(f"REGRESSION {name}: {args.metric} {current:.3f} > {allowed:.3f} (baseline {base:.3f})", file=sys.stderr)
+    if not regressions:
+        print(f"No regressions against {args.baseline} ({args.metric}).")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,280 @@
+# src/evaluate.py
+"""
+Accuracy-vs-cost evaluation: counts reps in a labeled corpus under a grid of settings.
+
+    python src/evaluate.py corpus.json --model-complexity 0,1 --inference-width full,320 \\
+        --smoothing none,one-euro --frame-skip 1,2 --keyframes off,on --workers 4
+
+The manifest is a JSON list of clips (videos or landmark traces) with ground-truth rep counts,
+paths relative to the manifest:
+
+    [{"path": "clips/squats_01.mp4", "reps": {"Squats": 12}},
+     {"path": "traces/20250101-101500", "exercise": "Bicep Curls", "reps": 10}]
+
+Each job runs the pose model once over one clip with one set of pose settings (model complexity,
+inference width, keyframes, frame skip) in a worker process, then replays the landmarks through
+every logic variant (smoothing, threshold offsets). CPU cost is measured with time.process_time
+(all threads of the worker, excluding video decoding) and reported per source frame. The table marks
+the Pareto-optimal configurations: no other configuration is both cheaper and at least as accurate.
+"""
+import argparse
+import csv
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from exercises.catalog import DEFINITIONS
+from exercises.engine import ExerciseEngine, validate_definition
+from tracker.filters import FILTERS, make_filter
+from tracker.trace import TraceReader, is_trace
+
+POSE_KEYS = ("model_complexity", "inference_width", "keyframes", "frame_skip")
+LOGIC_KEYS = ("smoothing", "enter_offset", "exit_offset")
+
+
+def load_manifest(path):
+    """Reads the manifest into [{"path", "reps": {exercise: count}}] with absolute paths."""
+    with open(path) as f:
+        entries = json.load(f)
+    base = os.path.dirname(os.path.abspath(path))
+    clips = []
+    for entry in entries:
+        reps = entry["reps"] if isinstance(entry["reps"], dict) else {entry["exercise"]: entry["reps"]}
+        unknown = sorted(set(reps) - set(DEFINITIONS))
+        if unknown:
+            raise ValueError(f"{entry['path']}: unknown exercise(s) {unknown}; known: {sorted(DEFINITIONS)}")
+        clips.append({"path": os.path.join(base, entry["path"]), "reps": {k: int(v) for k, v in reps.items()}})
+    return clips
+
+
+def landmark_stream(path, pose, flip=True):
+    """
+    Runs the pose detector over a video (or reads a trace) with the given pose settings.
+    Returns (timestamps, landmarks (n, 33, 4) with NaN rows where nobody was detected, CPU seconds, source frames).
+    """
+    skip = pose["frame_skip"]
+    if is_trace(path):
+        reader = TraceReader(path)
+        return (np.asarray(reader.timestamps[::skip], dtype=np.float64), np.array(reader.landmarks[::skip]),
+                0.0, len(reader))
+    import cv2
+    from tracker.pose_detector import PoseDetector
+    detector = PoseDetector(model_complexity=pose["model_complexity"], inference_width=pose["inference_width"] or None,
+                            keyframes=pose["keyframes"])
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise IOError(f"could not open video {path}")
+    timestamps, landmarks = [], []
+    no_person = np.full((33, 4), np.nan, dtype=np.float32)
+    cpu = 0.0
+    frames = 0
+    try:
+        while True:
+            if frames % skip:
+                # Skipped frames are only grabbed, not decoded
+                if not cap.grab(): break
+                frames += 1
+                continue
+            success, frame = cap.read()
+            if not success: break
+            frames += 1
+            start = time.process_time()
+            if flip:
+                frame = cv2.flip(frame, 1)
+            detector.find_pose(frame, draw=False)
+            found = detector.get_landmarks(frame)
+            cpu += time.process_time() - start
+            timestamps.append(cap.get(cv2.CAP_PROP_POS_MSEC) / 1000)
+            landmarks.append(no_person if found is None else found.copy())
+    finally:
+        cap.release()
+    return np.array(timestamps), np.array(landmarks, dtype=np.float32).reshape(-1, 33, 4), cpu, frames
+
+
+def logic_definitions(exercises, logic):
+    """Catalog definitions for `exercises` with the threshold offsets of a logic variant applied."""
+    return [dict(DEFINITIONS[name], enter=DEFINITIONS[name]["enter"] + logic["enter_offset"],
+                 exit=DEFINITIONS[name]["exit"] + logic["exit_offset"]) for name in exercises]
+
+
+def count_stream(timestamps, landmarks, exercises, logic):
+    """Counts reps for `exercises` over a landmark stream; returns ({exercise: count}, CPU seconds)."""
+    start = time.process_time()
+    engine = ExerciseEngine(logic_definitions(exercises, logic))
+    landmark_filter = make_filter(logic["smoothing"])
+    detected = ~np.isnan(landmarks[:, 0, 0])
+    for t, frame, ok in zip(timestamps, landmarks, detected):
+        if not ok: continue
+        t = float(t)
+        if landmark_filter: frame = landmark_filter(frame, t)
+        engine.process(frame, t)
+    counts = {name: int(engine.counters[i]) for i, name in enumerate(exercises)}
+    return counts, time.process_time() - start
+
+
+def evaluate_clip(clip, pose, logic_variants, flip=True):
+    """One worker job: one clip, one pose configuration, every logic variant. Returns one result row per variant."""
+    try:
+        timestamps, landmarks, pose_cpu, frames = landmark_stream(clip["path"], pose, flip)
+    except Exception as e:
+        return [{"path": clip["path"], **pose, **logic, "error": str(e)} for logic in logic_variants]
+    rows = []
+    exercises = sorted(clip["reps"])
+    for logic in logic_variants:
+        counts, logic_cpu = count_stream(timestamps, landmarks, exercises, logic)
+        errors = [abs(counts[name] - clip["reps"][name]) for name in exercises]
+        rows.append({"path": clip["path"], **pose, **logic, "error": None, "frames": frames,
+                     "cpu_s": pose_cpu + logic_cpu, "abs_error": sum(errors), "exact": sum(e == 0 for e in errors),
+                     "labels": len(exercises), "counts": counts})
+    return rows
+
+
+def summarize_configs(rows):
+    """Aggregates per-clip rows into one row per configuration, with Pareto flags."""
+    configs = {}
+    for row in rows:
+        key = tuple(row[k] for k in POSE_KEYS + LOGIC_KEYS)
+        config = configs.setdefault(key, {**{k: row[k] for k in POSE_KEYS + LOGIC_KEYS}, "frames": 0, "cpu_s": 0.0,
+                                          "abs_error": 0, "exact": 0, "labels": 0, "failed": 0})
+        if row["error"]:
+            config["failed"] += 1
+            continue
+        for k in ("frames", "cpu_s", "abs_error", "exact", "labels"):
+            config[k] += row[k]
+    summary = []
+    for config in configs.values():
+        config["cpu_ms_per_frame"] = 1000 * config["cpu_s"] / config["frames"] if config["frames"] else float("nan")
+        config["mean_abs_error"] = config["abs_error"] / config["labels"] if config["labels"] else float("nan")
+        config["exact_rate"] = config["exact"] / config["labels"] if config["labels"] else float("nan")
+        summary.append(config)
+    summary.sort(key=lambda c: (c["cpu_ms_per_frame"], c["mean_abs_error"]))
+    best_error = float("inf")
+    for config in summary:
+        # Sorted by cost, so a configuration is Pareto-optimal iff it beats every cheaper one on error
+        config["pareto"] = not config["failed"] and config["mean_abs_error"] < best_error
+        if config["pareto"]: best_error = config["mean_abs_error"]
+    return summary
+
+
+def print_table(summary):
+    print(f"{'':2}{'cpu ms/frame':>13}{'MAE':>7}{'exact':>7}  {'complexity':>10}{'width':>7}{'keyfr':>6}{'skip':>5}"
+          f"  {'smoothing':<10}{'enter':>6}{'exit':>6}")
+    for c in summary:
+        width = c["inference_width"] or "full"
+        failed = f"  ({c['failed']} clips failed)" if c["failed"] else ""
+        print(f"{'*' if c['pareto'] else '':2}{c['cpu_ms_per_frame']:>13.2f}{c['mean_abs_error']:>7.2f}"
+              f"{100 * c['exact_rate']:>6.0f}%  {c['model_complexity']:>10}{width:>7}{'on' if c['keyframes'] else 'off':>6}"
+              f"{c['frame_skip']:>5}  {c['smoothing']:<10}{c['enter_offset']:>+6g}{c['exit_offset']:>+6g}{failed}")
+    print("* = Pareto-optimal (no other configuration is cheaper and at least as accurate)")
+
+
+def parse_list(kind):
+    """argparse type for comma-separated lists."""
+    def parse(value):
+        return [kind(v) for v in value.split(",")]
+    return parse
+
+
+def width(value):
+    return 0 if value in ("full", "0") else int(value)
+
+
+def on_off(value):
+    if value not in ("on", "off"): raise argparse.ArgumentTypeError("expected on or off")
+    return value == "on"
+
+
+def smoothing(value):
+    if value != "none" and value not in FILTERS:
+        raise argparse.ArgumentTypeError(f"unknown filter {value!r}; choose from none, {', '.join(sorted(FILTERS))}")
+    return value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sweep settings over a labeled corpus and report count error against CPU cost.")
+    parser.add_argument("manifest", help="JSON list of {path, reps: {exercise: count}} (or {path, exercise, reps})")
+    grid = parser.add_argument_group("grid (comma-separated values)")
+    grid.add_argument("--model-complexity", type=parse_list(int), default=[1])
+    grid.add_argument("--inference-width", type=parse_list(width), default=[0], help="pixels, or 'full'")
+    grid.add_argument("--keyframes", type=parse_list(on_off), default=[False], help="on/off")
+    grid.add_argument("--frame-skip", type=parse_list(int), default=[1], help="run on every Nth frame")
+    grid.add_argument("--smoothing", type=parse_list(smoothing), default=["none"])
+    grid.add_argument("--enter-offset", type=parse_list(float), default=[0.0], help="degrees added to every enter threshold")
+    grid.add_argument("--exit-offset", type=parse_list(float), default=[0.0], help="degrees added to every exit threshold")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes (default: all cores)")
+    parser.add_argument("--no-flip", action="store_true", help="don't mirror video frames (the live app mirrors the webcam)")
+    parser.add_argument("--csv", help="also write the per-configuration table here")
+    args = parser.parse_args(argv)
+
+    clips = load_manifest(args.manifest)
+    if not clips:
+        print("The manifest lists no clips.", file=sys.stderr)
+        return 1
+    poses = [dict(zip(POSE_KEYS, values)) for values in itertools.product(
+        args.model_complexity, args.inference_width, args.keyframes, args.frame_skip)]
+    logic_variants = []
+    for values in itertools.product(args.smoothing, args.enter_offset, args.exit_offset):
+        logic = dict(zip(LOGIC_KEYS, values))
+        try:
+            for definition in logic_definitions(sorted(DEFINITIONS), logic):
+                validate_definition(definition)
+        except ValueError as e:
+            print(f"skipping enter {logic['enter_offset']:+g} / exit {logic['exit_offset']:+g}: {e}", file=sys.stderr)
+            continue
+        logic_variants.append(logic)
+    if not logic_variants:
+        print("No valid threshold variants.", file=sys.stderr)
+        return 1
+
+    jobs = []
+    for clip in clips:
+        clip_poses = poses
+        if is_trace(clip["path"]):
+            # Traces already hold landmarks, so only frame skipping changes their result: run each skip once
+            clip_poses = list({p["frame_skip"]: p for p in poses}.values())
+        jobs.extend((clip, pose) for pose in clip_poses)
+
+    print(f"{len(clips)} clips x {len(poses)} pose settings x {len(logic_variants)} logic variants "
+          f"({len(jobs)} pose runs)...", file=sys.stderr)
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max(1, min(args.workers, len(jobs)))) as pool:
+        futures = [pool.submit(evaluate_clip, clip, pose, logic_variants, not args.no_flip) for clip, pose in jobs]
+        rows = []
+        for (clip, pose), future in zip(jobs, futures):
+            try:
+                rows.extend(future.result())
+            except Exception as e:
+                # A crashed worker (e.g. killed for memory) fails its jobs, not the configurations already counted
+                rows.extend({"path": clip["path"], **pose, **logic, "error": f"{type(e).__name__}: {e}"}
+                            for logic in logic_variants)
+    for row in rows:
+        if row["error"]: print(f"{row['path']}: {row['error']}", file=sys.stderr)
+    # Trace rows were computed once for all pose settings; copy them to each configuration
+    expanded = []
+    for row in rows:
+        if is_trace(row["path"]):
+            expanded.extend(dict(row, **{k: p[k] for k in POSE_KEYS if k != "frame_skip"})
+                            for p in poses if p["frame_skip"] == row["frame_skip"])
+        else:
+            expanded.append(row)
+    summary = summarize_configs(expanded)
+    print_table(summary)
+    print(f"Evaluated in {time.perf_counter() - start:.1f}s.", file=sys.stderr)
+    if args.csv:
+        columns = list(POSE_KEYS + LOGIC_KEYS) + ["cpu_ms_per_frame", "mean_abs_error", "exact_rate", "abs_error",
+                                                  "labels", "frames", "failed", "pareto"]
+        if os.path.dirname(args.csv): os.makedirs(os.path.dirname(args.csv), exist_ok=True)
+        with open(args.csv, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=columns, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(summary)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,18 @@
+import numpy as np
+
 class BaseExercise:
+    # (first, vertex, last) landmark triplets the exercise measures - overridden by subclasses
+    joints = np.empty((0, 3), dtype=np.intp)
+    # Stage a fresh set starts in - overridden by subclasses
+    start_stage = None
 
     def __init__(self):
         self.counter = 0
-        self.stage = None # Can be 'up', 'down', etc. depending on exercise
+        self.stage = self.start_stage # Can be 'up', 'down', etc. depending on exercise
         self.name = "Base Exercise" # Should be overridden by subclasses
 
-    def process_landmarks(self, landmarks):
-
+    def process_landmarks(self, landmarks, timestamp=None):
+        """Advances the state machine by one frame; `timestamp` (seconds) defaults to now."""
         raise NotImplementedError("This method should be overridden by a subclass.")
 
     def get_counter(self):
@@ -18,4 +24,4 @@ class BaseExercise:
     def reset(self):
         """Resets the counter and stage for a new set."""
         self.counter = 0
-        self.stage = None
\ No newline at end of file
+        self.stage = self.start_stage
\ No newline at end of file
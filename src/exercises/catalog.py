@@ -0,0 +1,47 @@
+# Declarative exercise definitions - adding an exercise is adding an entry here.
+#
+#   name       display name used by the planner and the session log
+#   joints     (first, vertex, last) MediaPipe landmark triplets, given for the RIGHT side of the body
+#   side       "right" | "left" | "both" (every side must cross a threshold) | "either" (any side may)
+#   direction  "flex": the rep starts when the angle drops below `enter` and ends when it rises above `exit`
+#              "extend": the reverse (starts above `enter`, ends below `exit`)
+#   enter/exit thresholds in degrees; the gap between them is the hysteresis band
+#   stages     (rest stage, active stage) names shown in the UI; a rep is counted on returning to rest
+#   min_dwell  seconds a stage must last before the next transition is accepted (debounces jitter)
+#   concentric "flex" | "extend": which joint movement is the concentric (lifting) phase, for tempo
+#              analytics; defaults to `direction`
+
+CATALOG = [
+    {
+        "name": "Bicep Curls",
+        "joints": [(12, 14, 16)], # shoulder, elbow, wrist
+        "side": "right",
+        "direction": "flex",
+        "enter": 40, "exit": 160,
+        "stages": ("down", "up"), # Start with arm extended
+        "min_dwell": 0.0,
+        "concentric": "flex",
+    },
+    {
+        "name": "Squats",
+        "joints": [(24, 26, 28)], # hip, knee, ankle
+        "side": "right",
+        "direction": "flex",
+        "enter": 90, "exit": 160,
+        "stages": ("up", "down"),
+        "min_dwell": 0.0,
+        "concentric": "extend",
+    },
+    {
+        "name": "Pushups",
+        "joints": [(12, 14, 16)], # shoulder, elbow, wrist
+        "side": "right",
+        "direction": "flex",
+        "enter": 90, "exit": 160,
+        "stages": ("up", "down"),
+        "min_dwell": 0.0,
+        "concentric": "extend",
+    },
+]
+
+DEFINITIONS = {definition["name"]: definition for definition in CATALOG}
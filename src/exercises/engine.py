@@ -0,0 +1,236 @@
+import time
+
+import numpy as np
+
+from .base_exercise import BaseExercise
+from tracker.angle_utils import calculate_angles
+
+SIDES = ("right", "left", "both", "either")
+DIRECTIONS = ("flex", "extend")
+NO_PERSON = "NO PERSON"
+
+
+def mirror_landmark(index):
+    """Right-side body landmark -> the matching left-side one (MediaPipe numbers body pairs left=odd, right=even)."""
+    if index < 11: raise ValueError(f"landmark {index} is not a body landmark")
+    return index - 1 if index % 2 == 0 else index + 1
+
+
+def validate_definition(definition):
+    for key in ("name", "joints", "enter", "exit", "stages"):
+        if key not in definition:
+            raise ValueError(f"exercise definition is missing {key!r}: {definition!r}")
+    if not definition["joints"]:
+        raise ValueError(f"{definition['name']}: needs at least one joint triplet")
+    side = definition.get("side", "right")
+    direction = definition.get("direction", "flex")
+    if side not in SIDES:
+        raise ValueError(f"{definition['name']}: side must be one of {SIDES}, got {side!r}")
+    if direction not in DIRECTIONS:
+        raise ValueError(f"{definition['name']}: direction must be one of {DIRECTIONS}, got {direction!r}")
+    if definition.get("concentric", direction) not in DIRECTIONS:
+        raise ValueError(f"{definition['name']}: concentric must be one of {DIRECTIONS}, got {definition['concentric']!r}")
+    enter, exit_ = definition["enter"], definition["exit"]
+    if (direction == "flex" and enter >= exit_) or (direction == "extend" and enter <= exit_):
+        raise ValueError(f"{definition['name']}: enter/exit thresholds {enter}/{exit_} leave no hysteresis band "
+                         f"for a {direction} movement")
+
+
+class ExerciseEngine:
+    """
+    Evaluates every exercise definition in one vectorized pass per frame.
+
+    Definitions are compiled into flat index arrays: all joint triplets of all exercises are
+    measured with a single calculate_angles call, then per-exercise reductions (for two-sided
+    movements), threshold checks, dwell checks and stage transitions are plain array operations.
+    The per-frame cost is therefore flat in the number of exercises.
+
+    Rep analytics are kept the same way: per-rep tempo (time into and out of the turnaround
+    point), range of motion and time under tension are updated incrementally from each frame's
+    movement angle, so memory and per-frame work stay constant however long a session runs.
+    Angles that can't be measured (NaN) are skipped: a two-sided movement goes by the side that
+    is measured, and a frame with none leaves the state and the analytics unchanged.
+    """
+    def __init__(self, definitions):
+        self.definitions = list(definitions)
+        for definition in self.definitions:
+            validate_definition(definition)
+        triplets, owners, starts = [], [], []
+        for i, definition in enumerate(self.definitions):
+            starts.append(len(triplets))
+            side = definition.get("side", "right")
+            for joint in definition["joints"]:
+                if side in ("right", "both", "either"):
+                    triplets.append(tuple(joint)); owners.append(i)
+                if side in ("left", "both", "either"):
+                    triplets.append(tuple(mirror_landmark(j) for j in joint)); owners.append(i)
+        n = len(self.definitions)
+        self.names = [d["name"] for d in self.definitions]
+        self.triplets = np.array(triplets, dtype=np.intp).reshape(-1, 3)
+        self.triplet_owner = np.array(owners, dtype=np.intp)
+        self.starts = np.array(starts, dtype=np.intp)
+        # "extend" movements are evaluated as flex movements on negated angles
+        sign = np.array([1.0 if d.get("direction", "flex") == "flex" else -1.0 for d in self.definitions])
+        self.triplet_sign = sign[self.triplet_owner]
+        self.enter = sign * np.array([d["enter"] for d in self.definitions], dtype=np.float64)
+        self.exit = sign * np.array([d["exit"] for d in self.definitions], dtype=np.float64)
+        self.all_sides = np.array([d.get("side", "right") == "both" for d in self.definitions])
+        self.min_dwell = np.array([d.get("min_dwell", 0.0) for d in self.definitions], dtype=np.float64)
+        self.stage_names = [tuple(d["stages"]) for d in self.definitions]
+        # The first half of a rep (towards the turnaround) moves the joint in `direction`
+        self.first_half_concentric = np.array([d.get("concentric", d.get("direction", "flex")) == d.get("direction", "flex")
+                                               for d in self.definitions])
+        self.sign = sign
+        # State, one slot per exercise
+        self.active = np.zeros(n, dtype=bool)
+        self.counters = np.zeros(n, dtype=np.int64)
+        self.stage_since = np.full(n, -np.inf)
+        self.angles = np.full(len(self.triplets), np.nan)
+        self.person_present = True
+        self.last_timestamp = None
+        # Current rep, in signed angles (see triplet_sign): where it left rest, its turnaround, its extremes
+        self.rep_start = np.full(n, np.nan)
+        self.rep_turn = np.full(n, np.nan)
+        self.rep_low = np.full(n, np.inf)
+        self.rep_high = np.full(n, -np.inf)
+        # Last completed rep: [first half s, second half s, min angle, max angle] per exercise
+        self.last_rep = np.full((n, 4), np.nan)
+        # Per-set sums over completed reps: [time under tension, concentric s, eccentric s]; extremes in degrees
+        self.set_sums = np.zeros((n, 3))
+        self.set_min_angle = np.full(n, np.inf)
+        self.set_max_angle = np.full(n, -np.inf)
+
+    def index(self, name):
+        return self.names.index(name)
+
+    def process(self, landmarks, timestamp=None):
+        """Advances every exercise's state machine by one frame; returns the boolean mask of exercises that just completed a rep."""
+        if landmarks is None:
+            self.person_present = False
+            return np.zeros(len(self.definitions), dtype=bool)
+        t = time.monotonic() if timestamp is None else timestamp
+        self.person_present = True
+        self.last_timestamp = t
+        self.angles = calculate_angles(landmarks, self.triplets)
+        a = self.angles * self.triplet_sign
+        highest = np.fmax.reduceat(a, self.starts)
+        lowest = np.fmin.reduceat(a, self.starts)
+        # A rep starts when one side ("either") or every side ("both") is past `enter`,
+        # and ends once every side is back past `exit`
+        enter_angle = np.where(self.all_sides, highest, lowest)
+        exit_angle = lowest
+        settled = (t - self.stage_since) >= self.min_dwell
+        entering = ~self.active & settled & (enter_angle < self.enter)
+        completed = self.active & settled & (exit_angle > self.exit)
+        switched = entering | completed
+        self.active ^= switched
+        self.counters += completed
+        self.stage_since[switched] = t
+        self._track_reps(exit_angle, completed, t)
+        return completed
+
+    def _track_reps(self, a, completed, t):
+        """Updates the incremental rep analytics with this frame's (signed) movement angles."""
+        # Extremes and turnaround of the rep in progress (the turnaround is the deepest point)
+        deeper = a < self.rep_low
+        np.copyto(self.rep_low, a, where=deeper)
+        np.copyto(self.rep_turn, t, where=deeper)
+        # NaN compares false above; fmax keeps it out of the running maximum too
+        np.fmax(self.rep_high, a, out=self.rep_high)
+        if completed.any():
+            first = self.rep_turn - self.rep_start
+            second = t - self.rep_turn
+            low, high = self.rep_low * self.sign, self.rep_high * self.sign
+            rep = np.stack([first, second, np.minimum(low, high), np.maximum(low, high)], axis=1)
+            self.last_rep[completed] = rep[completed]
+            concentric = np.where(self.first_half_concentric, first, second)
+            eccentric = np.where(self.first_half_concentric, second, first)
+            self.set_sums[completed] += np.stack([first + second, concentric, eccentric], axis=1)[completed]
+            np.minimum(self.set_min_angle, rep[:, 2], out=self.set_min_angle, where=completed)
+            np.maximum(self.set_max_angle, rep[:, 3], out=self.set_max_angle, where=completed)
+            # The next rep's top of range is measured from here on
+            np.copyto(self.rep_high, a, where=completed)
+        # While resting past `exit`, the next rep hasn't started yet (nor before the first measured frame)
+        resting = ~self.active & ((a > self.exit) | (np.isnan(self.rep_start) & ~np.isnan(a)))
+        np.copyto(self.rep_start, t, where=resting)
+        np.copyto(self.rep_low, a, where=resting)
+        np.copyto(self.rep_turn, t, where=resting)
+
+    def reset(self, index=None):
+        """Resets one exercise (or all) to the rest stage with a zero counter."""
+        target = slice(None) if index is None else index
+        self.active[target] = False
+        self.counters[target] = 0
+        self.stage_since[target] = -np.inf
+        self.rep_start[target] = np.nan
+        self.rep_turn[target] = np.nan
+        self.rep_low[target] = np.inf
+        self.rep_high[target] = -np.inf
+        self.last_rep[target] = np.nan
+        self.set_sums[target] = 0
+        self.set_min_angle[target] = np.inf
+        self.set_max_angle[target] = -np.inf
+
+    def rep_metrics(self, index):
+        """Tempo and range of motion of the last completed rep, or None before the first rep of the set."""
+        first, second, low, high = self.last_rep[index]
+        if np.isnan(first): return None
+        concentric, eccentric = (first, second) if self.first_half_concentric[index] else (second, first)
+        return {"concentric_s": float(concentric), "eccentric_s": float(eccentric), "tut_s": float(first + second),
+                "min_angle": float(low), "max_angle": float(high)}
+
+    def set_metrics(self, index):
+        """Totals over the completed reps of the current set: time under tension, mean tempo, range of motion."""
+        reps = int(self.counters[index])
+        if reps == 0 or not np.isfinite(self.set_min_angle[index]): return None
+        tut, concentric, eccentric = self.set_sums[index]
+        return {"tut_s": float(tut), "concentric_s": float(concentric / reps), "eccentric_s": float(eccentric / reps),
+                "min_angle": float(self.set_min_angle[index]), "max_angle": float(self.set_max_angle[index])}
+
+    def stage(self, index):
+        if not self.person_present: return NO_PERSON
+        return self.stage_names[index][int(self.active[index])]
+
+
+class RuleExercise(BaseExercise):
+    """An exercise backed by one slot of an ExerciseEngine; processing a frame advances every exercise in that engine."""
+    def __init__(self, engine, name):
+        self.engine = engine
+        self.slot = engine.index(name)
+        self.joints = engine.triplets[engine.triplet_owner == self.slot]
+        self.start_stage = engine.stage_names[self.slot][0]
+        super().__init__()
+        self.name = name
+
+    @classmethod
+    def from_definition(cls, definition):
+        """A standalone exercise with its own single-definition engine."""
+        return cls(ExerciseEngine([definition]), definition["name"])
+
+    @property
+    def counter(self):
+        return int(self.engine.counters[self.slot])
+
+    @counter.setter
+    def counter(self, value):
+        self.engine.counters[self.slot] = value
+
+    @property
+    def stage(self):
+        return self.engine.stage(self.slot)
+
+    @stage.setter
+    def stage(self, value):
+        self.engine.active[self.slot] = value == self.engine.stage_names[self.slot][1]
+
+    def process_landmarks(self, landmarks, timestamp=None):
+        self.engine.process(landmarks, timestamp)
+
+    def rep_metrics(self):
+        return self.engine.rep_metrics(self.slot)
+
+    def set_metrics(self):
+        return self.engine.set_metrics(self.slot)
+
+    def reset(self):
+        self.engine.reset(self.slot)
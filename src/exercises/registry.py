@@ -0,0 +1,15 @@
+from functools import partial
+
+from .catalog import CATALOG
+from .engine import ExerciseEngine, RuleExercise
+
+# Display name -> factory for a standalone exercise. The UI planner and the headless tools both read from here.
+EXERCISES = {definition["name"]: partial(RuleExercise.from_definition, definition) for definition in CATALOG}
+
+def create_exercises(definitions=CATALOG):
+    """
+    Returns a {name: exercise} dict with one exercise per definition, all sharing one ExerciseEngine:
+    processing a frame on any of them evaluates every exercise in a single vectorized pass.
+    """
+    engine = ExerciseEngine(definitions)
+    return {name: RuleExercise(engine, name) for name in engine.names}
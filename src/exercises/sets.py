@@ -0,0 +1,20 @@
+class SetSplitter:
+    """Splits a running rep count into sets of `reps_per_set`, the same way the workout screen advances sets."""
+    def __init__(self, exercise, reps_per_set=0):
+        self.exercise = exercise
+        self.reps_per_set = reps_per_set
+        self.sets = []
+
+    def update(self):
+        """Call after each processed frame; returns True when a set was just completed."""
+        if self.reps_per_set and self.exercise.get_counter() >= self.reps_per_set:
+            self.sets.append(self.exercise.get_counter())
+            self.exercise.reset()
+            return True
+        return False
+
+    def finish(self):
+        if self.exercise.get_counter() > 0:
+            self.sets.append(self.exercise.get_counter())
+            self.exercise.reset()
+        return self.sets
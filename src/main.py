@@ -1,8 +1,30 @@
 # src/main.py
+import perf.startup # Imported first: its PROCESS_START is the reference for startup timings
+import argparse
 from ui.app import FitCountProApp
-import os
+from tracker.detector_options import add_detector_arguments, detector_options
 
 if __name__ == "__main__":
-    app = FitCountProApp()
+    parser = argparse.ArgumentParser(description="FitCount Pro - AI Fitness Tracker")
+    parser.add_argument("--record-trace", metavar="DIR",
+                        help="record each workout's landmark stream to a trace under DIR (replay with batch.py)")
+    parser.add_argument("--metrics-file", metavar="PATH",
+                        help="periodically export runtime metrics here (Prometheus text for *.prom, JSON otherwise)")
+    parser.add_argument("--metrics-interval", type=float, default=10.0, metavar="SECONDS")
+    parser.add_argument("--target-fps", type=float,
+                        help="switch pose model and inference resolution at runtime to hold this inference rate")
+    parser.add_argument("--display-fps", type=float, help="cap the video display rate (inference still runs at full rate)")
+    parser.add_argument("--profile-seconds", type=float, default=10.0,
+                        help="length of an on-demand profile capture (F9 or logs/profile.trigger)")
+    parser.add_argument("--pose-process", action="store_true",
+                        help="run camera capture and pose inference in a separate process (uses another CPU core)")
+    add_detector_arguments(parser)
+    args = parser.parse_args()
+
+    app = FitCountProApp(record_trace_dir=args.record_trace,
+                         metrics_file=args.metrics_file, metrics_interval=args.metrics_interval,
+                         detector_options=detector_options(args), display_fps=args.display_fps,
+                         smoothing=args.smoothing, target_fps=args.target_fps,
+                         profile_seconds=args.profile_seconds, pose_process=args.pose_process)
     app.protocol("WM_DELETE_WINDOW", app.on_closing)
-    app.mainloop()
\ No newline at end of file
+    app.mainloop()
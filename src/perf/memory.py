@@ -0,0 +1,156 @@
+import fnmatch
+import gc
+import json
+import os
+import time
+import tracemalloc
+
+# Allocations made by the measuring itself, or by imports, are not what a soak is looking for
+SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, fnmatch.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def rss_bytes(pid=None):
+    """Resident set size of process `pid` (default: this one) in bytes, or None where it can't be read (install psutil there)."""
+    try:
+        import psutil
+        try:
+            return psutil.Process(pid).memory_info().rss
+        except psutil.Error:
+            return None # Gone, or not ours to read
+    except ImportError:
+        pass
+    try:
+        with open(f"/proc/{pid or 'self'}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class MemoryWatch:
+    """
+    Samples process memory over a long run and judges its growth.
+
+    Each sample records RSS and the Python heap as seen by tracemalloc (NumPy buffers included).
+    tracemalloc's own bookkeeping grows with the number of live allocations; it is logged as
+    `tracemalloc_mb` and left out of `rss_mb`, so tracing doesn't count against the budget.
+    `child_pids` (a callable returning process ids) adds helper processes, such as the pose
+    process of --pose-process, to `rss_mb`; their share is logged as `child_rss_mb`.
+    The first sample after `warmup` seconds is the baseline - caches, model buffers and allocator
+    pools fill up before then - and a tracemalloc snapshot is taken with it. The run fails when RSS
+    (the traced heap where RSS is unavailable) grows more than `budget_mb` above the baseline, or when
+    the least-squares slope over the post-warm-up samples exceeds `max_slope_mb_per_hour` once they
+    span at least `min_slope_span` seconds. `report()` lists the allocation sites that grew most
+    since the baseline.
+    """
+    def __init__(self, budget_mb=150.0, max_slope_mb_per_hour=10.0, warmup=300.0, min_slope_span=1800.0,
+                 trace_frames=1, log_file=None, top=25, child_pids=None):
+        self.budget_mb = budget_mb
+        self.max_slope_mb_per_hour = max_slope_mb_per_hour
+        self.warmup = warmup
+        self.min_slope_span = min_slope_span
+        self.trace_frames = trace_frames
+        self.log_file = log_file
+        self.top = top
+        self.child_pids = child_pids or (lambda: ())
+        self.samples = []
+        self.baseline = None
+        self.failure = None
+        self._baseline_snapshot = None
+        self._started_at = None
+
+    def start(self):
+        self._started_at = time.monotonic()
+        if self.trace_frames and not tracemalloc.is_tracing(): tracemalloc.start(self.trace_frames)
+        if self.log_file and os.path.dirname(self.log_file): os.makedirs(os.path.dirname(self.log_file), exist_ok=True)
+
+    def sample(self, **extra):
+        """Records one sample (extra keyword values are logged with it) and returns it."""
+        gc.collect() # Uncollected cycles are not a leak; don't let them blur the trend
+        rss = rss_bytes()
+        tracing = tracemalloc.is_tracing()
+        traced = tracemalloc.get_traced_memory()[0] if tracing else None
+        overhead = tracemalloc.get_tracemalloc_memory() if tracing else 0
+        children = sum(filter(None, (rss_bytes(pid) for pid in self.child_pids() if pid)))
+        entry = {"elapsed_s": round(time.monotonic() - self._started_at, 1),
+                 "rss_mb": None if rss is None else round((rss - overhead + children) / 1e6, 2),
+                 "child_rss_mb": round(children / 1e6, 2),
+                 "traced_mb": None if traced is None else round(traced / 1e6, 2),
+                 "tracemalloc_mb": round(overhead / 1e6, 2), **extra}
+        self.samples.append(entry)
+        if self.baseline is None and entry["elapsed_s"] >= self.warmup:
+            self.baseline = entry
+            if tracemalloc.is_tracing(): self._baseline_snapshot = self._snapshot()
+        if self.baseline is not None:
+            entry["growth_mb"] = round(entry[self.key] - self.baseline[self.key], 2)
+            if self.failure is None and entry["growth_mb"] > self.budget_mb:
+                self.failure = (f"{self.key} grew {entry['growth_mb']:.1f} MB after warm-up "
+                                f"(budget {self.budget_mb:g} MB)")
+        if self.log_file:
+            with open(self.log_file, 'a') as f:
+                f.write(json.dumps(entry) + "\n")
+        return entry
+
+    @property
+    def key(self):
+        """The measure the budget and slope apply to: RSS, or the traced heap where RSS is unavailable."""
+        return "rss_mb" if not self.samples or self.samples[0]["rss_mb"] is not None else "traced_mb"
+
+    def slope(self, key=None):
+        """Least-squares growth in MB per hour over the post-warm-up samples (None before there are two)."""
+        key = key or self.key
+        points = [(s["elapsed_s"], s[key]) for s in self.samples
+                  if self.baseline is not None and s["elapsed_s"] >= self.baseline["elapsed_s"] and s[key] is not None]
+        if len(points) < 2: return None
+        mean_t = sum(t for t, _ in points) / len(points)
+        mean_m = sum(m for _, m in points) / len(points)
+        var = sum((t - mean_t) ** 2 for t, _ in points)
+        if var == 0: return None
+        return 3600 * sum((t - mean_t) * (m - mean_m) for t, m in points) / var
+
+    def finish(self):
+        """Applies the slope check to the whole run; returns the failure message, or None if memory held."""
+        if self.failure is None and self.baseline is not None:
+            span = self.samples[-1]["elapsed_s"] - self.baseline["elapsed_s"]
+            slope = self.slope()
+            if span >= self.min_slope_span and slope is not None and slope > self.max_slope_mb_per_hour:
+                self.failure = (f"{self.key} grows {slope:.1f} MB/hour after warm-up "
+                                f"(limit {self.max_slope_mb_per_hour:g} MB/hour)")
+        return self.failure
+
+    def report(self):
+        """A text report of the run: the verdict, memory trend and the allocation sites that grew since the baseline."""
+        lines = []
+        if not self.samples:
+            return "No samples.\n"
+        last = self.samples[-1]
+        lines.append(f"Duration {last['elapsed_s'] / 3600:.2f} h, {len(self.samples)} samples, "
+                     f"result: {'FAIL - ' + self.failure if self.failure else 'OK'}")
+        if self.baseline is None:
+            lines.append(f"Run ended before the {self.warmup:g}s warm-up; no growth was measured.")
+            return "\n".join(lines) + "\n"
+        for key in ("rss_mb", "traced_mb"):
+            if last[key] is None: continue
+            slope = self.slope(key)
+            lines.append(f"{key}: {self.baseline[key]:.1f} MB after warm-up -> {last[key]:.1f} MB now, "
+                         f"max {max(s[key] for s in self.samples):.1f} MB"
+                         + (f", trend {slope:+.2f} MB/hour" if slope is not None else ""))
+        if self._baseline_snapshot is not None and tracemalloc.is_tracing():
+            group = "traceback" if self.trace_frames > 1 else "lineno"
+            lines += ["", f"== Top {self.top} allocation sites by growth since warm-up =="]
+            grown = [d for d in self._snapshot().compare_to(self._baseline_snapshot, group) if d.size_diff > 0]
+            for diff in grown[:self.top]:
+                lines.append(str(diff))
+                if group == "traceback":
+                    lines += ["    " + line for line in diff.traceback.format()]
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _snapshot():
+        return tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
@@ -0,0 +1,146 @@
+import bisect
+import itertools
+import json
+import os
+import time
+
+import numpy as np
+
+from perf.stats import summarize
+
+# Stages of the live frame loop that are timed
+STAGES = ("capture", "inference", "logic", "render")
+# Source values that only ever grow; exported as Prometheus counters (<name>_total), the rest as gauges
+COUNTERS = ("captured", "inferred", "read_failures", "dropped_before_inference", "dropped_before_display",
+            "governor_switches")
+# Histogram bucket upper bounds in milliseconds (33 ms ~ one 30 FPS frame)
+BUCKETS_MS = (1, 2, 5, 10, 20, 33, 50, 100, 200, 500)
+
+
+class RollingWindow:
+    """
+    Fixed-size ring of the most recent samples.
+    Adding a sample is O(1) and allocation-free; statistics are only computed when asked for.
+    """
+    def __init__(self, size=300):
+        self._samples = np.zeros(size, dtype=np.float64)
+        self._count = 0
+
+    def add(self, value):
+        self._samples[self._count % len(self._samples)] = value
+        self._count += 1
+
+    def values(self):
+        """Returns the samples in the window (unordered once the ring has wrapped)."""
+        return self._samples[:min(self._count, len(self._samples))]
+
+
+class RuntimeMetrics:
+    """
+    Lightweight instrumentation for the live loop: per-stage latency windows, effective FPS
+    and the number of frames without a detected person. Recording is a couple of array writes.
+    The windows feed the overlay and JSON snapshots; Prometheus histograms come from per-stage
+    bucket counts and sums kept since start, since Prometheus expects them never to go down.
+    """
+    def __init__(self, window=300):
+        self.stages = {name: RollingWindow(window) for name in STAGES}
+        # Per stage: one count per bucket of BUCKETS_MS plus +Inf (not cumulative), and the total seconds
+        self._buckets = {name: [0] * (len(BUCKETS_MS) + 1) for name in STAGES}
+        self._sums = dict.fromkeys(STAGES, 0.0)
+        self._frame_times = RollingWindow(window)
+        self.frames = 0
+        self.no_detection = 0
+        self._sources = []
+
+    def record(self, stage, seconds):
+        self.stages[stage].add(seconds)
+        self._buckets[stage][bisect.bisect_left(BUCKETS_MS, seconds * 1000)] += 1
+        self._sums[stage] += seconds
+
+    def frame_done(self, detected=True):
+        """Marks a frame as displayed; call once per frame the UI shows."""
+        self._frame_times.add(time.perf_counter())
+        self.frames += 1
+        if not detected:
+            self.no_detection += 1
+
+    def add_source(self, fn):
+        """Registers a callable returning a dict of extra counters (e.g. FramePipeline.stats) for snapshots."""
+        self._sources.append(fn)
+
+    def fps(self):
+        times = self._frame_times.values()
+        if len(times) < 2: return 0.0
+        span = times.max() - times.min()
+        return (len(times) - 1) / span if span > 0 else 0.0
+
+    def snapshot(self):
+        """Returns all metrics as a JSON-friendly dict."""
+        snapshot = {
+            "timestamp": time.time(),
+            "fps": self.fps(),
+            "frames": self.frames,
+            "no_detection_frames": self.no_detection,
+            "stages": {name: summarize(window.values()) for name, window in self.stages.items()},
+        }
+        for source in self._sources:
+            snapshot.update(source())
+        return snapshot
+
+    def overlay_text(self):
+        """A compact multi-line summary for the on-screen overlay."""
+        lines = [f"FPS {self.fps():.1f}   no person {self.no_detection}"]
+        for name, window in self.stages.items():
+            s = summarize(window.values())
+            lines.append(f"{name:<9} p50 {s['p50_ms']:5.1f}  p95 {s['p95_ms']:5.1f} ms")
+        return "\n".join(lines)
+
+    def to_prometheus(self, prefix="fitcount"):
+        """Renders the metrics in the Prometheus text exposition format."""
+        lines = [f"# TYPE {prefix}_stage_seconds histogram"]
+        for name, buckets in self._buckets.items():
+            for bound, count in zip(BUCKETS_MS, itertools.accumulate(buckets)):
+                lines.append(f'{prefix}_stage_seconds_bucket{{stage="{name}",le="{bound / 1000:g}"}} {count}')
+            total = sum(buckets)
+            lines.append(f'{prefix}_stage_seconds_bucket{{stage="{name}",le="+Inf"}} {total}')
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{name}"}} {self._sums[name]:.6f}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{name}"}} {total}')
+        for name, value in (("frames_total", self.frames), ("no_detection_frames_total", self.no_detection)):
+            lines.append(f"# TYPE {prefix}_{name} counter")
+            lines.append(f"{prefix}_{name} {value}")
+        gauges = {"fps": self.fps()}
+        for source in self._sources:
+            gauges.update((k, v) for k, v in source().items() if isinstance(v, (int, float)))
+        for name, value in gauges.items():
+            kind, metric = ("counter", f"{name}_total") if name in COUNTERS else ("gauge", name)
+            lines.append(f"# TYPE {prefix}_{metric} {kind}")
+            lines.append(f"{prefix}_{metric} {value}")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsExporter:
+    """
+    Periodically writes metrics to a local file: Prometheus text for *.prom, JSON otherwise.
+    Files are replaced atomically so scrapers never read a half-written file.
+    """
+    def __init__(self, path, interval=10.0):
+        self.path = path
+        self.interval = interval
+        self._next = 0.0
+
+    def maybe_export(self, metrics, now=None):
+        now = time.monotonic() if now is None else now
+        if now < self._next: return False
+        self._next = now + self.interval
+        self.export(metrics)
+        return True
+
+    def export(self, metrics):
+        if os.path.dirname(self.path): os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, 'w') as f:
+            if self.path.endswith(".prom"):
+                f.write(metrics.to_prometheus())
+            else:
+                json.dump(metrics.snapshot(), f, indent=2)
+        os.replace(tmp, self.path)
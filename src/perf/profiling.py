@@ -0,0 +1,143 @@
+import cProfile
+import io
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+
+from storage.session_log import LOG_DIR
+
+PROFILE_DIR = os.path.join(LOG_DIR, 'profiles')
+# Creating this file asks a running app for a capture; its content may give the duration in seconds
+TRIGGER_FILE = os.path.join(LOG_DIR, 'profile.trigger')
+
+
+class ProfileCapture:
+    """
+    Profiles a running session on demand: cProfile on every participating thread plus
+    tracemalloc allocation snapshots, for a fixed number of seconds.
+
+    Nothing is installed while idle - no profiler hooks and no allocation tracing - so the
+    only idle cost is an attribute check in `sync_thread`. The thread that calls `start`
+    is profiled directly; background loops call `sync_thread()` once per iteration to join
+    and leave captures. When a capture ends, the merged profile (.prof, readable with pstats
+    or snakeviz) and a text report with the top functions and the top allocation sites are
+    written to logs/profiles/ on a background thread.
+    """
+    def __init__(self, seconds=10.0, out_dir=PROFILE_DIR, trigger_file=TRIGGER_FILE, top=30):
+        self.seconds = seconds
+        self.out_dir = out_dir
+        self.trigger_file = trigger_file
+        self.top = top
+        self.active = False
+        self.writing = False
+        self.duration = seconds
+        self.last_report = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._profiles = {} # thread name -> cProfile.Profile of the capture in progress
+        self._enabled = set() # threads whose profile is still collecting
+        self._started_at = None
+        self._started_tracemalloc = False
+        self._snapshot = None
+
+    def start(self, seconds=None):
+        """Starts a capture on the calling thread; returns False if one is already running or being written."""
+        with self._lock:
+            if self.active or self.writing: return False
+            self._profiles = {}
+            self._enabled = set()
+            self._started_at = time.time()
+            self.duration = seconds or self.seconds
+            self._started_tracemalloc = not tracemalloc.is_tracing()
+            if self._started_tracemalloc: tracemalloc.start(25)
+            self._snapshot = tracemalloc.take_snapshot()
+            self.active = True
+        self.sync_thread()
+        return True
+
+    def stop(self):
+        """Ends the capture (call from the thread that started it) and writes the reports in the background."""
+        with self._lock:
+            if not self.active: return
+            self.active = False
+            self.writing = True
+        self.sync_thread()
+        threading.Thread(target=self._write_reports, name="fitcount-profile-writer", daemon=True).start()
+
+    def sync_thread(self):
+        """Enables or disables profiling of the calling thread to follow the capture state."""
+        profile = getattr(self._local, "profile", None)
+        if self.active and profile is None:
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # Python 3.12+ allows one active profiler per process; the first thread's captures everything
+                return
+            self._local.profile = profile
+            with self._lock:
+                self._profiles[threading.current_thread().name] = profile
+                self._enabled.add(threading.current_thread().name)
+        elif not self.active and profile is not None:
+            profile.disable()
+            self._local.profile = None
+            with self._lock:
+                self._enabled.discard(threading.current_thread().name)
+
+    def poll_trigger(self):
+        """Starts a capture if the trigger file exists (and removes it); returns True if a capture started."""
+        if self.active or self.writing or not self.trigger_file or not os.path.exists(self.trigger_file): return False
+        try:
+            with open(self.trigger_file) as f:
+                text = f.read().strip()
+            os.remove(self.trigger_file)
+        except OSError:
+            return False
+        try:
+            seconds = float(text) if text else None
+        except ValueError:
+            seconds = None
+        return self.start(seconds)
+
+    def _write_reports(self):
+        try:
+            self._write_report_files()
+        finally:
+            self.writing = False
+
+    def _write_report_files(self):
+        # Give background loops one iteration to notice the end of the capture
+        deadline = time.monotonic() + 1.0
+        while self._enabled and time.monotonic() < deadline:
+            time.sleep(0.02)
+        with self._lock:
+            # A thread that didn't come round in time (e.g. blocked on the camera) is left out
+            profiles = {name: p for name, p in self._profiles.items() if name not in self._enabled}
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        if self._started_tracemalloc: tracemalloc.stop()
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self._started_at))
+        os.makedirs(self.out_dir, exist_ok=True)
+        base = os.path.join(self.out_dir, f"profile-{stamp}")
+
+        stats = None
+        for profile in profiles.values():
+            if stats is None: stats = pstats.Stats(profile)
+            else: stats.add(profile)
+        lines = [f"FitCount Pro profile, {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self._started_at))}, "
+                 f"{self.duration:g}s, threads: {', '.join(sorted(profiles)) or 'none'}", ""]
+        if stats is not None:
+            stats.dump_stats(base + ".prof")
+            for order in ("cumulative", "tottime"):
+                out = io.StringIO()
+                pstats.Stats(base + ".prof", stream=out).sort_stats(order).print_stats(self.top)
+                lines += [f"== Top {self.top} functions by {order} time ==", out.getvalue()]
+        lines.append(f"== Top {self.top} allocation sites (growth during the capture) ==")
+        lines.append(f"traced memory: {current / 1e6:.1f} MB now, {peak / 1e6:.1f} MB peak")
+        for diff in snapshot.compare_to(self._snapshot, "lineno")[:self.top]:
+            lines.append(str(diff))
+        with open(base + ".txt", 'w') as f:
+            f.write("\n".join(lines) + "\n")
+        self.last_report = base + ".txt"
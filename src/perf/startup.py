@@ -0,0 +1,42 @@
+import json
+import os
+import platform
+import time
+
+from storage.session_log import LOG_DIR
+
+STARTUP_LOG = os.path.join(LOG_DIR, 'startup_times.jsonl')
+# Marks recorded during a normal start, in the order they happen
+MARKS = ("first_paint", "backend_ready", "first_frame", "first_inference")
+
+# Reference point for every mark; main.py imports this module before anything heavy
+PROCESS_START = time.perf_counter()
+
+
+class StartupTimer:
+    """
+    Records how long startup milestones take (seconds since PROCESS_START) and appends
+    one JSON line per run to logs/startup_times.jsonl once every mark has been seen,
+    so startup time can be compared across releases.
+    """
+    def __init__(self, log_file=STARTUP_LOG, start=PROCESS_START):
+        self.log_file = log_file
+        self.start = start
+        self.marks = {}
+        self.written = False
+
+    def mark(self, name):
+        """Records a milestone the first time it happens; later calls are ignored."""
+        if name in self.marks: return
+        self.marks[name] = time.perf_counter() - self.start
+        if not self.written and all(m in self.marks for m in MARKS):
+            self.write()
+
+    def write(self):
+        self.written = True
+        if not self.log_file: return
+        if os.path.dirname(self.log_file): os.makedirs(os.path.dirname(self.log_file), exist_ok=True)
+        entry = {"timestamp": time.strftime("%Y-%m-%d %H:%M:%S"), "python": platform.python_version(),
+                 "platform": platform.platform(), **{f"{k}_s": round(v, 4) for k, v in self.marks.items()}}
+        with open(self.log_file, 'a') as f:
+            f.write(json.dumps(entry) + "\n")
@@ -0,0 +1,11 @@
+import numpy as np
+
+def summarize(samples_s):
+    """Summarizes per-frame durations (seconds) as p50/p95/p99/mean in ms plus the implied frames per second."""
+    if len(samples_s) == 0:
+        return {"samples": 0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "mean_ms": 0.0, "fps": 0.0}
+    ms = np.asarray(samples_s, dtype=np.float64) * 1000
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    mean = float(ms.mean())
+    return {"samples": int(ms.size), "p50_ms": float(p50), "p95_ms": float(p95), "p99_ms": float(p99),
+            "mean_ms": mean, "fps": 1000 / mean if mean else 0.0}
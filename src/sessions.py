@@ -0,0 +1,74 @@
+# src/sessions.py
+"""
+Workout history from the SQLite session store.
+
+    python src/sessions.py summary [--since 2025-01-01]
+    python src/sessions.py weekly [--exercise Squats] [--weeks 52]
+    python src/sessions.py import logs/session_log.csv
+    python src/sessions.py check [--repair]
+"""
+import argparse
+import sys
+
+from storage.session_store import SessionStore, DB_FILE
+
+
+def print_table(rows, columns):
+    if not rows:
+        print("No data."); return
+    widths = [max(len(c), *(len(str(r[c])) for r in rows)) for c in columns]
+    print("  ".join(c.ljust(w) for c, w in zip(columns, widths)))
+    for r in rows:
+        print("  ".join(str(r[c]).ljust(w) for c, w in zip(columns, widths)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query FitCount Pro workout history.")
+    parser.add_argument("--db", default=DB_FILE, help=f"session database (default: {DB_FILE})")
+    commands = parser.add_subparsers(dest="command", required=True)
+    summary = commands.add_parser("summary", help="totals per exercise")
+    summary.add_argument("--since", help="YYYY-MM-DD")
+    weekly = commands.add_parser("weekly", help="totals per exercise per week")
+    weekly.add_argument("--exercise")
+    weekly.add_argument("--weeks", type=int, default=52)
+    daily = commands.add_parser("daily", help="totals per exercise per day")
+    daily.add_argument("--exercise")
+    daily.add_argument("--since", help="YYYY-MM-DD")
+    importer = commands.add_parser("import", help="one-time import of session_log.csv-style files")
+    importer.add_argument("paths", nargs="+")
+    check = commands.add_parser("check", help="verify the database file and its aggregates")
+    check.add_argument("--repair", action="store_true",
+                       help="rebuild the aggregates and close sessions interrupted by a crash (app must not be running)")
+    args = parser.parse_args(argv)
+
+    store = SessionStore(args.db)
+    try:
+        if args.command == "summary":
+            print_table(store.progress_summary(args.since),
+                        ["exercise", "sets", "reps", "active_days", "best_day_reps", "first_day", "last_day"])
+        elif args.command == "weekly":
+            print_table(store.weekly_totals(args.exercise, args.weeks), ["week", "exercise", "sets", "reps"])
+        elif args.command == "daily":
+            print_table(store.daily_totals(args.exercise, args.since), ["day", "exercise", "sets", "reps"])
+        elif args.command == "import":
+            for path in args.paths:
+                rows = store.import_csv(path)
+                print(f"{path}: {rows} rows imported" if rows else f"{path}: already imported")
+        elif args.command == "check":
+            problems = store.check()
+            open_sessions = store.open_sessions()
+            for problem in problems: print(problem)
+            if open_sessions: print(f"open sessions (recording now, or interrupted): {open_sessions}")
+            if args.repair:
+                store.rebuild_daily_totals()
+                print(f"Rebuilt daily totals; closed {store.recover_sessions()} interrupted sessions.")
+                problems = store.check()
+            print("OK" if not problems else f"{len(problems)} problems")
+            return 1 if problems else 0
+    finally:
+        store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
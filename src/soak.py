@@ -0,0 +1,146 @@
+# src/soak.py
+"""
+Soak test: runs the full app on a looping video or synthetic frames for hours and checks memory.
+
+    python src/soak.py --hours 8                                  # synthetic frames
+    python src/soak.py --hours 8 --video clip.mp4 --exercise Squats --budget-mb 100
+    xvfb-run -a python src/soak.py --hours 8                      # on a machine without a display
+
+A workout that never ends is started and the real UI loop (WorkoutScreen.update_frame, rendering
+included) runs against the source. RSS and tracemalloc memory are sampled every --interval seconds
+to logs/soak-<time>.jsonl; with --pose-process, RSS is the sum of both processes. After --warmup
+seconds the growth is measured against a baseline: the run fails as soon as it exceeds --budget-mb,
+and at the end if the trend is steeper than --max-slope.
+A report with the allocation sites that grew most is written next to the log. Exit code 1 on failure.
+The window must stay visible (rendering is skipped for hidden windows); workouts go to a scratch database.
+The synthetic stick figure covers capture, inference and rendering but may not be taken for a person
+by the pose model; loop a real clip with --video to cover rep counting and set logging as well.
+"""
+import argparse
+import functools
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from exercises.registry import EXERCISES
+from perf.memory import MemoryWatch
+from storage.session_log import LOG_DIR
+from tracker.detector_options import add_detector_arguments, detector_options
+
+
+class LoopingCapture:
+    """A video file that plays forever at its own frame rate, standing in for a camera."""
+    def __init__(self, path):
+        import cv2
+        self.cv2 = cv2
+        self.cap = cv2.VideoCapture(path)
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self._next_at = 0.0
+
+    def grab(self):
+        now = time.perf_counter()
+        if now < self._next_at: time.sleep(self._next_at - now)
+        self._next_at = max(now, self._next_at) + 1.0 / self.fps
+        if self.cap.grab(): return True
+        self.cap.set(self.cv2.CAP_PROP_POS_FRAMES, 0)
+        return self.cap.grab()
+
+    def retrieve(self):
+        return self.cap.retrieve()
+
+    def read(self):
+        return self.retrieve() if self.grab() else (False, None)
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def get(self, prop):
+        return self.cap.get(prop)
+
+    def release(self):
+        self.cap.release()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run FitCount Pro unattended and check for memory growth.")
+    parser.add_argument("--video", help="loop this clip (default: synthetic frames)")
+    parser.add_argument("--fps", type=float, default=30.0, help="frame rate of the synthetic source")
+    parser.add_argument("--hours", type=float, default=1.0)
+    parser.add_argument("--exercise", choices=sorted(EXERCISES), default="Squats")
+    parser.add_argument("--reps", type=int, default=10, help="reps per set, so sets keep being logged")
+    parser.add_argument("--interval", type=float, default=60.0, metavar="SECONDS", help="time between memory samples")
+    parser.add_argument("--warmup", type=float, default=300.0, metavar="SECONDS",
+                        help="memory growth is measured from the first sample after this")
+    parser.add_argument("--budget-mb", type=float, default=150.0, help="allowed memory growth after warm-up")
+    parser.add_argument("--max-slope", type=float, default=10.0, metavar="MB_PER_HOUR",
+                        help="allowed memory trend after warm-up, checked when at least --min-slope-span is covered")
+    parser.add_argument("--min-slope-span", type=float, default=1800.0, metavar="SECONDS")
+    parser.add_argument("--trace-frames", type=int, default=1,
+                        help="stack depth recorded per allocation by tracemalloc (0 disables it; deeper is slower)")
+    parser.add_argument("--target-fps", type=float)
+    parser.add_argument("--display-fps", type=float)
+    parser.add_argument("--pose-process", action="store_true", help="capture and pose inference in a separate process")
+    add_detector_arguments(parser)
+    args = parser.parse_args(argv)
+
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    log_file = os.path.join(LOG_DIR, f"soak-{stamp}.jsonl")
+    report_file = os.path.join(LOG_DIR, f"soak-{stamp}.txt")
+    watch = MemoryWatch(args.budget_mb, args.max_slope, args.warmup, args.min_slope_span, args.trace_frames, log_file)
+    # Started before the app is built so its allocations are traced from the beginning
+    watch.start()
+
+    from ui.app import FitCountProApp
+    if args.video:
+        if not os.path.isfile(args.video):
+            parser.error(f"no such video: {args.video}")
+        capture = functools.partial(LoopingCapture, args.video)
+    else:
+        from tracker.synthetic import SyntheticCapture
+        capture = functools.partial(SyntheticCapture, fps=args.fps)
+    scratch = tempfile.mkdtemp(prefix="fitcount-soak-")
+    # Scratch database, no CSV import and no startup-time entry: a soak run leaves the user's logs alone
+    app = FitCountProApp(detector_options=detector_options(args), display_fps=args.display_fps,
+                         smoothing=args.smoothing, target_fps=args.target_fps,
+                         capture=capture, db_file=os.path.join(scratch, "soak.db"), pose_process=args.pose_process,
+                         import_log=None, startup_log=None)
+    if args.pose_process:
+        # Capture, inference and the frame ring live in the pose process; its memory counts too
+        watch.child_pids = lambda: [app.pipeline.pid()] if app.pipeline else []
+    # Enough sets that the workout outlives the run
+    app.after_idle(lambda: app.start_workout([{"exercise": args.exercise, "sets": 10 ** 6, "reps": args.reps}]))
+    deadline = time.monotonic() + args.hours * 3600
+
+    def sample():
+        screen = app.frames["WorkoutScreen"]
+        pipeline = app.pipeline.stats() if app.pipeline else {}
+        entry = watch.sample(captured=pipeline.get("captured", 0), inferred=pipeline.get("inferred", 0),
+                             rendered=screen.renderer.rendered if screen.renderer else 0,
+                             sets_saved=app.session_writer.written)
+        print(f"[{entry['elapsed_s'] / 60:6.1f} min] rss {entry['rss_mb']} MB (pose process {entry['child_rss_mb']} MB), "
+              f"traced {entry['traced_mb']} MB, "
+              f"{entry['rendered']} frames shown", flush=True)
+        if app.backend_error and not watch.failure: watch.failure = app.backend_error
+        if watch.failure or time.monotonic() >= deadline:
+            app.on_closing(); return
+        app.after(int(args.interval * 1000), sample)
+
+    app.after(int(min(args.interval, args.warmup) * 1000), sample)
+    try:
+        app.mainloop()
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    failure = watch.finish()
+    report = watch.report()
+    with open(report_file, 'w') as f:
+        f.write(report)
+    print(report)
+    print(f"Samples: {log_file}\nReport: {report_file}")
+    return 1 if failure else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,234 @@
+# src/stations.py
+"""
+Multi-station mode: serves several cameras (or video files standing in for them) from one host.
+
+    python src/stations.py 0 1 2 --exercise Squats --reps 10
+    python src/stations.py --config stations.json
+
+Every station runs in its own worker process with its own PoseDetector and exercise
+state machine, so throughput scales with the number of cores. The coordinator in the
+main process aggregates per-station counts and writes one session log per station
+(logs/stations/<name>.csv, same schema as logs/session_log.csv). Exit code 1 if any station fails.
+
+A config file is a JSON list of stations:
+    [{"name": "bay1", "source": 0, "exercise": "Squats", "reps": 10}, ...]
+"""
+import argparse
+import json
+import multiprocessing as mp
+import os
+import queue
+import signal
+import sys
+import time
+from datetime import datetime
+
+from exercises.registry import EXERCISES
+from exercises.sets import SetSplitter
+from storage.session_log import append_session_log, TIMESTAMP_FORMAT
+from tracker.detector_options import add_detector_arguments, detector_options
+from tracker.filters import make_filter
+
+STATUS_INTERVAL = 2.0
+
+
+def parse_source(source):
+    """Camera indices are given as integers, anything else is a video file path."""
+    return int(source) if isinstance(source, str) and source.isdigit() else source
+
+
+def station_worker(station, events, stop, detector_options=None, loop=False, smoothing=None):
+    """
+    Runs one station: capture -> PoseDetector -> exercise state machine, entirely inside this process.
+    Reports ("rep" | "set" | "status" | "done", station name, payload) tuples on `events`.
+    """
+    # Ctrl+C reaches the whole process group; the coordinator stops us through `stop` so the partial set is kept
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    import cv2
+    from tracker.pose_detector import PoseDetector
+
+    name = station["name"]
+    source = parse_source(station["source"])
+    cap = cv2.VideoCapture(source)
+    if not cap.isOpened():
+        events.put(("done", name, {"error": f"could not open source {source!r}"}))
+        return
+    detector = PoseDetector(**(detector_options or {}))
+    landmark_filter = make_filter(smoothing)
+    splitter = SetSplitter(EXERCISES[station["exercise"]](), station.get("reps", 0))
+    is_camera = isinstance(source, int)
+    frames = 0
+    status_frames = 0
+    status_at = time.monotonic()
+    error = None
+    rewound = False
+    try:
+        while not stop.is_set():
+            success, frame = cap.read()
+            captured_at = time.monotonic()
+            if not success:
+                if loop and not is_camera:
+                    if rewound:
+                        # Nothing readable even from the start: don't spin on a broken file
+                        error = f"no frames could be read from {source!r} after rewinding"
+                        break
+                    cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                    rewound = True
+                    continue
+                break
+            rewound = False
+            frames += 1
+            status_frames += 1
+            if is_camera:
+                frame = cv2.flip(frame, 1)
+            detector.find_pose(frame, draw=False)
+            landmarks = detector.get_landmarks(frame)
+            if landmarks is not None:
+                prev_reps = splitter.exercise.get_counter()
+                if landmark_filter: landmarks = landmark_filter(landmarks, captured_at)
+                splitter.exercise.process_landmarks(landmarks, captured_at)
+                if splitter.exercise.get_counter() > prev_reps:
+                    events.put(("rep", name, {"reps": splitter.exercise.get_counter()}))
+                if splitter.update():
+                    events.put(("set", name, {"set": len(splitter.sets), "reps": splitter.sets[-1]}))
+            now = time.monotonic()
+            if now - status_at >= STATUS_INTERVAL:
+                events.put(("status", name, {"fps": status_frames / (now - status_at), "frames": frames}))
+                status_at, status_frames = now, 0
+        # Log a partially finished set when the station is stopped or the video ends
+        sets_before = len(splitter.sets)
+        splitter.finish()
+        if len(splitter.sets) > sets_before:
+            events.put(("set", name, {"set": len(splitter.sets), "reps": splitter.sets[-1]}))
+        events.put(("done", name, {"error": error, "frames": frames}))
+    finally:
+        cap.release()
+
+
+class StationCoordinator:
+    """Starts one worker process per station and aggregates their events."""
+    def __init__(self, stations, detector_options=None, loop=False, log_dir=os.path.join('logs', 'stations'),
+                 smoothing=None):
+        self.stations = stations
+        self.log_dir = log_dir
+        self.ctx = mp.get_context("spawn")
+        self.events = self.ctx.Queue()
+        self.stop_event = self.ctx.Event()
+        self.processes = [self.ctx.Process(target=station_worker, name=f"station-{s['name']}",
+                                           args=(s, self.events, self.stop_event, detector_options, loop, smoothing),
+                                           daemon=True)
+                          for s in stations]
+        self.state = {s["name"]: {"exercise": s["exercise"], "reps": 0, "sets": 0, "total_reps": 0,
+                                  "fps": 0.0, "frames": 0, "done": False, "error": None} for s in stations}
+
+    def start(self):
+        for p in self.processes: p.start()
+
+    def stop(self, timeout=5.0):
+        self.stop_event.set()
+        deadline = time.monotonic() + timeout
+        while not all(s["done"] for s in self.state.values()) and time.monotonic() < deadline:
+            self.poll(timeout=0.1)
+        for p in self.processes:
+            p.join(max(0.0, deadline - time.monotonic()))
+            if p.is_alive(): p.terminate()
+
+    def running(self):
+        for p, station in zip(self.processes, self.stations):
+            state = self.state[station["name"]]
+            if not state["done"] and not p.is_alive() and p.exitcode is not None:
+                # Drain anything the worker sent before exiting, then treat a silent exit as a crash
+                self.poll(timeout=0.1)
+                if not state["done"]:
+                    state["done"] = True
+                    state["error"] = f"worker exited with code {p.exitcode}"
+        return not all(s["done"] for s in self.state.values())
+
+    def poll(self, timeout=0.5):
+        """Applies all pending station events; returns the number handled."""
+        handled = 0
+        try:
+            while True:
+                kind, name, payload = self.events.get(timeout=timeout if handled == 0 else 0)
+                self.handle(kind, name, payload)
+                handled += 1
+        except queue.Empty:
+            pass
+        return handled
+
+    def handle(self, kind, name, payload):
+        state = self.state[name]
+        if kind == "rep":
+            state["reps"] = payload["reps"]
+        elif kind == "set":
+            state["sets"] += 1
+            state["total_reps"] += payload["reps"]
+            state["reps"] = 0
+            append_session_log([{"Timestamp": datetime.now().strftime(TIMESTAMP_FORMAT), "Exercise": state["exercise"],
+                                 "Set": payload["set"], "Reps": payload["reps"]}],
+                               os.path.join(self.log_dir, f"{name}.csv"))
+        elif kind == "status":
+            state["fps"] = payload["fps"]
+            state["frames"] = payload["frames"]
+        elif kind == "done":
+            state["done"] = True
+            state["error"] = payload.get("error")
+            state["frames"] = payload.get("frames", state["frames"])
+
+    def summary_line(self):
+        parts = []
+        for name, s in self.state.items():
+            status = f"ERROR {s['error']}" if s["error"] else f"set {s['sets'] + 1} rep {s['reps']} ({s['fps']:.1f} FPS)"
+            parts.append(f"{name}: {status}")
+        return " | ".join(parts)
+
+
+def load_stations(args):
+    if args.config:
+        with open(args.config) as f:
+            stations = json.load(f)
+    else:
+        stations = [{"name": f"station{i + 1}", "source": source, "exercise": args.exercise, "reps": args.reps}
+                    for i, source in enumerate(args.sources)]
+    for station in stations:
+        if station.get("exercise") not in EXERCISES:
+            raise SystemExit(f"Station {station.get('name')!r}: unknown exercise {station.get('exercise')!r}")
+    return stations
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run several camera stations from one host.")
+    parser.add_argument("sources", nargs="*", help="camera indices or video files, one station each")
+    parser.add_argument("--config", help="JSON list of stations (name, source, exercise, reps)")
+    parser.add_argument("--exercise", default="Squats", choices=sorted(EXERCISES))
+    parser.add_argument("--reps", type=int, default=10, help="reps per set")
+    parser.add_argument("--loop", action="store_true", help="loop video-file sources instead of stopping at the end")
+    add_detector_arguments(parser)
+    args = parser.parse_args(argv)
+    if not args.config and not args.sources:
+        parser.error("give at least one source or --config")
+
+    coordinator = StationCoordinator(load_stations(args), detector_options(args), args.loop, smoothing=args.smoothing)
+    coordinator.start()
+    next_status = time.monotonic()
+    try:
+        while coordinator.running():
+            coordinator.poll()
+            if time.monotonic() >= next_status:
+                print(coordinator.summary_line(), flush=True)
+                next_status = time.monotonic() + STATUS_INTERVAL
+    except KeyboardInterrupt:
+        print("Stopping stations...")
+    finally:
+        coordinator.stop()
+
+    for name, s in coordinator.state.items():
+        if s["error"]:
+            print(f"{name}: {s['error']}", file=sys.stderr)
+        else:
+            print(f"{name}: {s['exercise']} - {s['sets']} sets, {s['total_reps']} reps, {s['frames']} frames")
+    return 1 if any(s["error"] for s in coordinator.state.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
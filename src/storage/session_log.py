@@ -0,0 +1,18 @@
+import csv
+import os
+
+LOG_DIR = 'logs'
+LOG_FILE = os.path.join(LOG_DIR, 'session_log.csv')
+FIELDNAMES = ["Timestamp", "Exercise", "Set", "Reps"]
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+def append_session_log(rows, log_file=LOG_FILE):
+    """Appends set rows ({Timestamp, Exercise, Set, Reps}; other keys are left out) to a CSV log, writing the header for new files."""
+    if not rows: return
+    log_dir = os.path.dirname(log_file)
+    if log_dir: os.makedirs(log_dir, exist_ok=True)
+    file_exists = os.path.isfile(log_file)
+    with open(log_file, 'a', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES, extrasaction='ignore')
+        if not file_exists: writer.writeheader()
+        writer.writerows(rows)
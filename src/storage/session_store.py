@@ -0,0 +1,290 @@
+import csv
+import os
+import sqlite3
+from datetime import datetime, timedelta
+
+from storage.session_log import LOG_DIR, TIMESTAMP_FORMAT
+
+DB_FILE = os.path.join(LOG_DIR, 'fitcountpro.db')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    started_at TEXT NOT NULL,
+    ended_at TEXT,
+    source TEXT NOT NULL DEFAULT 'app',
+    writer_pid INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_started ON sessions(started_at);
+
+CREATE TABLE IF NOT EXISTS sets (
+    id INTEGER PRIMARY KEY,
+    session_id INTEGER NOT NULL REFERENCES sessions(id),
+    timestamp TEXT NOT NULL,
+    exercise TEXT NOT NULL,
+    set_number INTEGER NOT NULL,
+    reps INTEGER NOT NULL,
+    tut_s REAL,
+    concentric_s REAL,
+    eccentric_s REAL,
+    min_angle REAL,
+    max_angle REAL
+);
+CREATE INDEX IF NOT EXISTS idx_sets_exercise_time ON sets(exercise, timestamp);
+CREATE INDEX IF NOT EXISTS idx_sets_time ON sets(timestamp);
+CREATE INDEX IF NOT EXISTS idx_sets_session ON sets(session_id);
+
+-- Per exercise per day totals, kept in step with `sets` by the triggers below
+CREATE TABLE IF NOT EXISTS daily_totals (
+    exercise TEXT NOT NULL,
+    day TEXT NOT NULL,
+    sets INTEGER NOT NULL,
+    reps INTEGER NOT NULL,
+    PRIMARY KEY (exercise, day)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_daily_totals_day ON daily_totals(day);
+
+CREATE TRIGGER IF NOT EXISTS trg_sets_insert AFTER INSERT ON sets BEGIN
+    INSERT INTO daily_totals (exercise, day, sets, reps)
+    VALUES (NEW.exercise, substr(NEW.timestamp, 1, 10), 1, NEW.reps)
+    ON CONFLICT (exercise, day) DO UPDATE SET sets = sets + 1, reps = reps + excluded.reps;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_sets_delete AFTER DELETE ON sets BEGIN
+    UPDATE daily_totals SET sets = sets - 1, reps = reps - OLD.reps
+    WHERE exercise = OLD.exercise AND day = substr(OLD.timestamp, 1, 10);
+END;
+
+-- CSV logs that were already imported, so importing is one-time per file
+CREATE TABLE IF NOT EXISTS imports (
+    path TEXT PRIMARY KEY,
+    imported_at TEXT NOT NULL,
+    rows INTEGER NOT NULL
+);
+"""
+
+# Columns added after the first release: (name, type); added to older databases on open
+SESSION_COLUMNS_ADDED = [
+    ("writer_pid", "INTEGER"), # process recording the session, so recovery can tell a live one from a crashed one
+]
+SET_COLUMNS_ADDED = [
+    ("tut_s", "REAL"),         # time under tension over the set's reps
+    ("concentric_s", "REAL"),  # mean concentric duration per rep
+    ("eccentric_s", "REAL"),   # mean eccentric duration per rep
+    ("min_angle", "REAL"),     # range of motion over the set, degrees
+    ("max_angle", "REAL"),
+]
+# Optional session-log row keys for those columns
+SET_METRIC_KEYS = {"TUT": "tut_s", "Concentric": "concentric_s", "Eccentric": "eccentric_s",
+                   "Min Angle": "min_angle", "Max Angle": "max_angle"}
+
+INSERT_SET = ("INSERT INTO sets (session_id, timestamp, exercise, set_number, reps, tut_s, concentric_s, eccentric_s, "
+              "min_angle, max_angle) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)")
+
+
+def pid_alive(pid):
+    """Whether process `pid` is running on this machine (psutil where installed, else the OS's own check)."""
+    try:
+        import psutil
+        return psutil.pid_exists(pid)
+    except ImportError:
+        pass
+    if os.name == "nt":
+        # os.kill(pid, 0) would terminate the process on Windows
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, pid) # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle: return kernel32.GetLastError() == 5 # ERROR_ACCESS_DENIED: running, as another user
+        code = ctypes.c_ulong()
+        ok = kernel32.GetExitCodeProcess(handle, ctypes.byref(code))
+        kernel32.CloseHandle(handle)
+        return not ok or code.value == 259 # STILL_ACTIVE
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass # Running, as another user
+    return True
+
+
+def set_values(session_id, row):
+    """Parameters for INSERT_SET from a session-log row; the rep analytics keys are optional."""
+    return (session_id, row["Timestamp"], row["Exercise"], int(row["Set"]), int(row["Reps"]),
+            *(row.get(key) for key in SET_METRIC_KEYS))
+
+
+class SessionStore:
+    """
+    SQLite-backed workout history.
+    Sets are stored per session; daily per-exercise totals are maintained on insert,
+    so progress queries read a few hundred aggregate rows instead of every set ever logged.
+    The database runs in WAL mode with synchronous=FULL: a committed set survives a crash or
+    power cut, and an interrupted transaction is rolled back on the next open.
+    """
+    def __init__(self, path=DB_FILE):
+        if os.path.dirname(path): os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = FULL")
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+
+    def _migrate(self):
+        with self.conn:
+            for table, added in (("sessions", SESSION_COLUMNS_ADDED), ("sets", SET_COLUMNS_ADDED)):
+                columns = {r["name"] for r in self.conn.execute(f"PRAGMA table_info({table})")}
+                for name, sql_type in added:
+                    if name not in columns:
+                        self.conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {sql_type}")
+
+    def close(self):
+        self.conn.close()
+
+    # -- Writing ----------------------------------------------------------
+
+    def start_session(self, started_at=None, source="app"):
+        started_at = started_at or datetime.now().strftime(TIMESTAMP_FORMAT)
+        with self.conn:
+            return self.conn.execute("INSERT INTO sessions (started_at, source, writer_pid) VALUES (?, ?, ?)",
+                                     (started_at, source, os.getpid())).lastrowid
+
+    def end_session(self, session_id, ended_at=None):
+        ended_at = ended_at or datetime.now().strftime(TIMESTAMP_FORMAT)
+        with self.conn:
+            self.conn.execute("UPDATE sessions SET ended_at = ? WHERE id = ?", (ended_at, session_id))
+
+    def add_sets(self, session_id, rows):
+        """Adds session-log rows ({Timestamp, Exercise, Set, Reps}, plus optional SET_METRIC_KEYS) to a session."""
+        with self.conn:
+            self.conn.executemany(INSERT_SET, [set_values(session_id, r) for r in rows])
+
+    def save_session(self, rows, source="app"):
+        """Stores a finished session's rows in one transaction; returns the new session id (None if no rows)."""
+        if not rows: return None
+        with self.conn:
+            session_id = self.conn.execute(
+                "INSERT INTO sessions (started_at, ended_at, source) VALUES (?, ?, ?)",
+                (rows[0]["Timestamp"], rows[-1]["Timestamp"], source)).lastrowid
+            self.conn.executemany(INSERT_SET, [set_values(session_id, r) for r in rows])
+        return session_id
+
+    def recover_sessions(self):
+        """
+        Closes sessions left open by a crash: ended_at becomes the time of their last set,
+        and open sessions without any sets are removed. Returns the number of sessions recovered.
+        A session whose recording process (writer_pid) is still running is left alone, so another
+        app instance on the same database keeps its session; sessions from before writer_pid was
+        stored count as crashed.
+        """
+        dead = [r["id"] for r in self.conn.execute("SELECT id, writer_pid FROM sessions WHERE ended_at IS NULL")
+                if r["writer_pid"] is None or not pid_alive(r["writer_pid"])]
+        if not dead: return 0
+        ids = f"({', '.join('?' * len(dead))})"
+        with self.conn:
+            self.conn.execute(f"DELETE FROM sessions WHERE id IN {ids} "
+                              "AND NOT EXISTS (SELECT 1 FROM sets WHERE sets.session_id = sessions.id)", dead)
+            return self.conn.execute(
+                "UPDATE sessions SET ended_at = (SELECT MAX(timestamp) FROM sets WHERE sets.session_id = sessions.id) "
+                f"WHERE ended_at IS NULL AND id IN {ids}", dead).rowcount
+
+    def import_csv(self, path, session_gap=timedelta(hours=1)):
+        """
+        One-time import of a session_log.csv-style file. The CSV has no session ids, so rows
+        further apart than `session_gap` start a new session. Returns the number of rows imported
+        (0 if this file was imported before).
+        """
+        key = os.path.abspath(path)
+        if self.conn.execute("SELECT 1 FROM imports WHERE path = ?", (key,)).fetchone():
+            return 0
+        with open(path, newline='') as f:
+            rows = sorted(csv.DictReader(f), key=lambda r: r["Timestamp"])
+        sessions, current, last = [], [], None
+        for row in rows:
+            stamp = datetime.strptime(row["Timestamp"], TIMESTAMP_FORMAT)
+            if current and stamp - last > session_gap:
+                sessions.append(current); current = []
+            current.append(row)
+            last = stamp
+        if current: sessions.append(current)
+        with self.conn:
+            for session_rows in sessions:
+                session_id = self.conn.execute(
+                    "INSERT INTO sessions (started_at, ended_at, source) VALUES (?, ?, 'csv-import')",
+                    (session_rows[0]["Timestamp"], session_rows[-1]["Timestamp"])).lastrowid
+                self.conn.executemany(INSERT_SET, [set_values(session_id, r) for r in session_rows])
+            self.conn.execute("INSERT INTO imports (path, imported_at, rows) VALUES (?, ?, ?)",
+                              (key, datetime.now().strftime(TIMESTAMP_FORMAT), len(rows)))
+        return len(rows)
+
+    # -- Consistency --------------------------------------------------------
+
+    def check(self):
+        """
+        Verifies the database file and the aggregates: returns a list of problems (empty when consistent).
+        Checks SQLite's integrity_check, daily_totals against totals recomputed from `sets`,
+        and sets that point at missing sessions.
+        """
+        problems = [f"integrity: {r[0]}" for r in self.conn.execute("PRAGMA integrity_check") if r[0] != "ok"]
+        mismatches = self.conn.execute(
+            "SELECT exercise, day, SUM(ss) AS stored_sets, SUM(sr) AS stored_reps, "
+            "SUM(a_s) AS actual_sets, SUM(ar) AS actual_reps FROM ("
+            "  SELECT exercise, day, sets AS ss, reps AS sr, 0 AS a_s, 0 AS ar FROM daily_totals"
+            "  UNION ALL"
+            "  SELECT exercise, substr(timestamp, 1, 10), 0, 0, COUNT(*), SUM(reps) FROM sets GROUP BY 1, 2"
+            ") GROUP BY exercise, day HAVING SUM(ss) != SUM(a_s) OR SUM(sr) != SUM(ar)").fetchall()
+        problems += [f"daily_totals {r['exercise']} {r['day']}: stored {r['stored_sets']} sets/{r['stored_reps']} reps, "
+                     f"sets table has {r['actual_sets']}/{r['actual_reps']}" for r in mismatches]
+        orphans = self.conn.execute(
+            "SELECT COUNT(*) FROM sets WHERE session_id NOT IN (SELECT id FROM sessions)").fetchone()[0]
+        if orphans: problems.append(f"{orphans} sets belong to missing sessions")
+        return problems
+
+    def rebuild_daily_totals(self):
+        """Recomputes daily_totals from `sets`."""
+        with self.conn:
+            self.conn.execute("DELETE FROM daily_totals")
+            self.conn.execute("INSERT INTO daily_totals (exercise, day, sets, reps) "
+                              "SELECT exercise, substr(timestamp, 1, 10), COUNT(*), SUM(reps) FROM sets GROUP BY 1, 2")
+
+    def open_sessions(self):
+        """Ids of sessions that have no end time (still recording, or interrupted)."""
+        return [r[0] for r in self.conn.execute("SELECT id FROM sessions WHERE ended_at IS NULL ORDER BY id")]
+
+    # -- Queries ----------------------------------------------------------
+
+    def daily_totals(self, exercise=None, since=None, until=None):
+        """Returns [{exercise, day, sets, reps}] from the aggregate table; `since`/`until` are 'YYYY-MM-DD'."""
+        sql, params = "SELECT exercise, day, sets, reps FROM daily_totals WHERE sets > 0", []
+        if exercise: sql += " AND exercise = ?"; params.append(exercise)
+        if since: sql += " AND day >= ?"; params.append(since)
+        if until: sql += " AND day <= ?"; params.append(until)
+        return [dict(r) for r in self.conn.execute(sql + " ORDER BY day, exercise", params)]
+
+    def weekly_totals(self, exercise=None, weeks=52, today=None):
+        """Returns [{exercise, week, sets, reps}] for the last `weeks` weeks; `week` is the Monday it starts on."""
+        today = today or datetime.now().date()
+        since = (today - timedelta(weeks=weeks)).isoformat()
+        sql = ("SELECT exercise, date(day, 'weekday 0', '-6 days') AS week, SUM(sets) AS sets, SUM(reps) AS reps "
+               "FROM daily_totals WHERE day >= ? AND sets > 0")
+        params = [since]
+        if exercise: sql += " AND exercise = ?"; params.append(exercise)
+        sql += " GROUP BY exercise, week ORDER BY week, exercise"
+        return [dict(r) for r in self.conn.execute(sql, params)]
+
+    def progress_summary(self, since=None):
+        """Per exercise: total sets and reps, active days, best day, first and last day trained."""
+        sql = ("SELECT exercise, SUM(sets) AS sets, SUM(reps) AS reps, COUNT(*) AS active_days, "
+               "MAX(reps) AS best_day_reps, MIN(day) AS first_day, MAX(day) AS last_day "
+               "FROM daily_totals WHERE sets > 0")
+        params = []
+        if since: sql += " AND day >= ?"; params.append(since)
+        return [dict(r) for r in self.conn.execute(sql + " GROUP BY exercise ORDER BY exercise", params)]
+
+    def session_count(self, since=None):
+        sql, params = "SELECT COUNT(*) FROM sessions", []
+        if since: sql += " WHERE started_at >= ?"; params.append(since)
+        return self.conn.execute(sql, params).fetchone()[0]
@@ -0,0 +1,149 @@
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+from storage.session_log import LOG_DIR, TIMESTAMP_FORMAT, append_session_log
+from storage.session_store import SessionStore, DB_FILE, INSERT_SET, set_values
+
+
+class SessionWriter:
+    """
+    Write-behind persistence for the live app.
+
+    The UI thread only enqueues commands (start a session, add a set, end the session, import a CSV);
+    a background thread owns its own SessionStore connection and applies them. Commands that arrive
+    close together are committed as one transaction, and nothing waits longer than `flush_interval`
+    seconds to reach disk. Each batch is a single SQLite transaction, so a crash leaves either the whole
+    batch or none of it. A batch that fails is kept and retried every `retry_interval` seconds, and
+    `error` says why until it goes through; sets still unsaved at close() are written to a CSV in
+    logs/ instead (see `unsaved_file`). On start, sessions left open by a writer that crashed are closed
+    (see SessionStore.recover_sessions); those of a writer still running elsewhere are left alone.
+    """
+    def __init__(self, path=DB_FILE, flush_interval=1.0, max_batch=64, retry_interval=5.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.retry_interval = retry_interval
+        self.max_batch = max_batch
+        self.recovered = 0
+        self.written = 0
+        self.error = None
+        self.unsaved_file = None
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="fitcount-writer", daemon=True)
+        self._thread.start()
+
+    # -- Called from the UI thread; none of these block on disk I/O -------
+
+    def start_session(self, source="app"):
+        self._queue.put(("start", datetime.now().strftime(TIMESTAMP_FORMAT), source))
+
+    def add_set(self, row):
+        """Queues one session-log row ({Timestamp, Exercise, Set, Reps}) for the current session."""
+        self._queue.put(("set", dict(row)))
+
+    def end_session(self):
+        self._queue.put(("end", datetime.now().strftime(TIMESTAMP_FORMAT)))
+
+    def import_csv(self, path):
+        self._queue.put(("import", path))
+
+    def close(self, timeout=5.0):
+        """Flushes everything queued so far and stops the writer thread."""
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    # -- Writer thread ----------------------------------------------------
+
+    def _run(self):
+        store = SessionStore(self.path)
+        self.recovered = store.recover_sessions()
+        self._session_id = None
+        self._session_sets = 0
+        pending = [] # Commands of a failed transaction, retried ahead of newer ones
+        try:
+            stopping = False
+            while not stopping:
+                commands = self._collect(self.retry_interval if pending else None)
+                if commands and commands[-1] is None:
+                    commands.pop(); stopping = True
+                retrying = bool(pending)
+                batch, pending = pending + [c for c in commands if c[0] != "import"], []
+                if batch:
+                    state = (self._session_id, self._session_sets)
+                    try:
+                        self._apply(store, batch)
+                        self.written += sum(1 for command in batch if command[0] == "set")
+                        if retrying: self.error = None
+                    except Exception as e:
+                        # The transaction was rolled back, so forget what it did and try it again later
+                        self._session_id, self._session_sets = state
+                        self.error = f"could not save workout data: {e}"
+                        pending = batch
+                for command in commands:
+                    if command[0] != "import": continue
+                    try:
+                        # import_csv manages its own transaction and is one-time per file
+                        store.import_csv(command[1])
+                    except Exception as e:
+                        self.error = f"could not import {command[1]}: {e}"
+            if pending: self._save_unsaved(pending)
+        finally:
+            store.close()
+
+    def _collect(self, timeout):
+        """Takes the next batch of commands off the queue (None marks close()); empty if `timeout` passes first."""
+        try:
+            batch = [self._queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_interval
+        while batch[-1] is not None and len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0: break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _apply(self, store, batch):
+        """Applies a batch of start/set/end commands in one transaction."""
+        conn = store.conn
+        with conn:
+            for command in batch:
+                kind = command[0]
+                if kind == "start":
+                    self._session_id = conn.execute("INSERT INTO sessions (started_at, source, writer_pid) VALUES (?, ?, ?)",
+                                                    (*command[1:], os.getpid())).lastrowid
+                    self._session_sets = 0
+                elif kind == "set":
+                    row = command[1]
+                    if self._session_id is None:
+                        self._session_id = conn.execute(
+                            "INSERT INTO sessions (started_at, source, writer_pid) VALUES (?, 'app', ?)",
+                            (row["Timestamp"], os.getpid())).lastrowid
+                    conn.execute(INSERT_SET, set_values(self._session_id, row))
+                    self._session_sets += 1
+                elif kind == "end" and self._session_id is not None:
+                    if self._session_sets:
+                        conn.execute("UPDATE sessions SET ended_at = ? WHERE id = ?", (command[1], self._session_id))
+                    else:
+                        # Nothing was logged; don't keep an empty session around
+                        conn.execute("DELETE FROM sessions WHERE id = ?", (self._session_id,))
+                    self._session_id = None
+
+    def _save_unsaved(self, commands):
+        """Last resort on close: writes the sets the database would not take to a CSV that sessions.py can import."""
+        rows = [command[1] for command in commands if command[0] == "set"]
+        if not rows: return
+        self.unsaved_file = os.path.join(LOG_DIR, f"unsaved-sets-{datetime.now():%Y%m%d-%H%M%S}.csv")
+        try:
+            append_session_log(rows, self.unsaved_file)
+        except OSError as e:
+            self.unsaved_file = None
+            self.error = f"{self.error}; {len(rows)} sets are lost ({e})"
+            return
+        self.error = (f"{self.error}; {len(rows)} sets were written to {self.unsaved_file} "
+                      f"(python src/sessions.py import {self.unsaved_file})")
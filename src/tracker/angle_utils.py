@@ -1,25 +1,18 @@
-import math
+import numpy as np
 
-def calculate_angle(p1, p2, p3):
+def calculate_angles(landmarks, triplets):
     """
-    Calculates the angle formed by three points (p1, p2, p3), where p2 is the vertex.
-    Points are lists or tuples of [id, x, y].
-    Returns angle in degrees.
+    Angles at the vertex of many (first, vertex, last) landmark triplets at once.
+    landmarks: array of shape (..., 33, >=2) - one frame or a stack of frames.
+    triplets: int array of shape (k, 3) holding (first, vertex, last) landmark indices.
+    Returns an array of shape (..., k) with angles in degrees in [0, 180].
     """
-    # Get the coordinates
-    x1, y1 = p1[1:]
-    x2, y2 = p2[1:]
-    x3, y3 = p3[1:]
-
-    # Calculate the angle using atan2
-    angle = math.degrees(math.atan2(y3 - y2, x3 - x2) - math.atan2(y1 - y2, x1 - x2))
-    
-    # Ensure the angle is positive
-    if angle < 0:
-        angle += 360
-    
-    # Normalize to the smaller angle 
-    if angle > 180:
-        angle = 360 - angle
-        
-    return angle
\ No newline at end of file
+    triplets = np.asarray(triplets)
+    a = landmarks[..., triplets[:, 0], :2]
+    b = landmarks[..., triplets[:, 1], :2]
+    c = landmarks[..., triplets[:, 2], :2]
+    angle = np.degrees(np.arctan2(c[..., 1] - b[..., 1], c[..., 0] - b[..., 0])
+                       - np.arctan2(a[..., 1] - b[..., 1], a[..., 0] - b[..., 0]))
+    # Fold into the smaller of the two angles between the rays
+    angle = np.abs(angle)
+    return np.where(angle > 180, 360 - angle, angle)
@@ -0,0 +1,30 @@
+# Command-line flags for PoseDetector settings, shared by main.py and the headless tools.
+# Kept free of MediaPipe imports so tools can parse arguments before loading the model.
+from tracker.filters import FILTERS
+from tracker.overlay import OVERLAY_MODES
+
+
+def add_detector_arguments(parser):
+    """Adds the PoseDetector tuning flags to an argparse parser."""
+    group = parser.add_argument_group("pose detector")
+    group.add_argument("--inference-width", type=int, help="downscale frames to this width before pose inference")
+    group.add_argument("--roi", action="store_true", help="run inference on a box around the tracked person")
+    group.add_argument("--model-complexity", type=int, choices=(0, 1, 2), default=1,
+                       help="pose model: 0 = lite (fastest), 1 = full, 2 = heavy (most accurate)")
+    group.add_argument("--keyframes", action="store_true",
+                       help="run the pose model only on keyframes and track landmarks with optical flow in between")
+    group.add_argument("--max-keyframe-interval", type=int, default=6, metavar="FRAMES",
+                       help="longest gap between keyframes when the user is still (default: 6)")
+    group.add_argument("--no-smooth-landmarks", action="store_true", help="disable MediaPipe's own landmark smoothing")
+    group.add_argument("--overlay", choices=OVERLAY_MODES, default="full",
+                       help="skeleton drawn on the video: all of it, the exercise's joints, those plus angles, or none")
+    group.add_argument("--smoothing", choices=["none"] + sorted(FILTERS), default="none",
+                       help="temporal landmark filter applied before rep counting")
+    return group
+
+
+def detector_options(args):
+    """Turns parsed arguments into PoseDetector keyword arguments."""
+    return {"inference_width": args.inference_width, "roi": args.roi, "model_complexity": args.model_complexity,
+            "smooth_landmarks": not args.no_smooth_landmarks, "keyframes": args.keyframes,
+            "max_keyframe_interval": args.max_keyframe_interval, "overlay": args.overlay}
@@ -0,0 +1,139 @@
+import math
+
+import numpy as np
+
+# Temporal landmark filters that sit between PoseDetector.get_landmarks and process_landmarks.
+# Each filter smooths the x/y/z columns of a (33, 4) landmark array, vectorized over all
+# landmarks, with O(1) state per landmark. Visibility is passed through untouched and gates
+# the update: a landmark the model can't see holds its last estimate instead of chasing noise.
+
+
+class LandmarkFilter:
+    """Base class: call with (landmarks, timestamp) per frame, landmarks None when nobody was detected."""
+    def __init__(self, min_visibility=0.5, max_gap=0.5):
+        self.min_visibility = min_visibility
+        self.max_gap = max_gap # seconds without a detection after which the filter starts over
+        self._out = np.zeros((33, 4), dtype=np.float32)
+        self._t_prev = None
+
+    def __call__(self, landmarks, timestamp):
+        """Returns the filtered landmarks (a reused array) or None if `landmarks` is None."""
+        if landmarks is None:
+            return None
+        if self._t_prev is None or timestamp - self._t_prev > self.max_gap:
+            self.reset(landmarks)
+        else:
+            dt = timestamp - self._t_prev
+            self.update(landmarks[:, :3].astype(np.float64), landmarks[:, 3:4].astype(np.float64),
+                        dt if dt > 0 else 1 / 30)
+        self._t_prev = timestamp
+        self._out[:, :3] = self.estimate()
+        self._out[:, 3] = landmarks[:, 3]
+        return self._out
+
+    def reset(self, landmarks):
+        raise NotImplementedError
+
+    def update(self, measured, visibility, dt):
+        """Folds one (33, 3) measurement into the state; `visibility` is the (33, 1) visibility column."""
+        raise NotImplementedError
+
+    def estimate(self):
+        raise NotImplementedError
+
+
+class OneEuroFilter(LandmarkFilter):
+    """
+    One-Euro filter (Casiez et al.): a low-pass filter whose cutoff rises with speed,
+    so slow jitter is smoothed heavily while fast movements keep little lag.
+    min_cutoff is in Hz; beta scales the cutoff with speed in pixels per second.
+    """
+    def __init__(self, min_cutoff=1.0, beta=0.005, d_cutoff=1.0, **kwargs):
+        super().__init__(**kwargs)
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self._x = np.zeros((33, 3))
+        self._dx = np.zeros((33, 3))
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        return 1.0 / (1.0 + 1.0 / (2 * math.pi * cutoff * dt))
+
+    def reset(self, landmarks):
+        self._x[:] = landmarks[:, :3]
+        self._dx[:] = 0
+
+    def update(self, measured, visibility, dt):
+        visible = visibility >= self.min_visibility
+        a_d = self._alpha(self.d_cutoff, dt)
+        dx = a_d * (measured - self._x) / dt + (1 - a_d) * self._dx
+        cutoff = self.min_cutoff + self.beta * np.abs(dx)
+        a = self._alpha(cutoff, dt)
+        x = a * measured + (1 - a) * self._x
+        self._x = np.where(visible, x, self._x)
+        self._dx = np.where(visible, dx, 0.0)
+
+    def estimate(self):
+        return self._x
+
+
+class KalmanFilter(LandmarkFilter):
+    """
+    Constant-velocity Kalman filter run independently per coordinate (state: position, velocity).
+    Measurement noise grows as visibility drops, so confident landmarks are trusted more;
+    below min_visibility the filter only predicts.
+    process_noise is the acceleration variance (px/s^2)^2, measurement_noise the position variance (px^2).
+    """
+    def __init__(self, process_noise=5e4, measurement_noise=4.0, **kwargs):
+        super().__init__(**kwargs)
+        self.q = process_noise
+        self.r = measurement_noise
+        self._p = np.zeros((33, 3))
+        self._v = np.zeros((33, 3))
+        self._c00 = np.zeros((33, 3)) # covariance entries
+        self._c01 = np.zeros((33, 3))
+        self._c11 = np.zeros((33, 3))
+
+    def reset(self, landmarks):
+        self._p[:] = landmarks[:, :3]
+        self._v[:] = 0
+        self._c00[:] = self.r
+        self._c01[:] = 0
+        self._c11[:] = self.q
+
+    def update(self, measured, visibility, dt):
+        visible = visibility >= self.min_visibility
+        # Predict
+        p = self._p + self._v * dt
+        c00 = self._c00 + dt * (2 * self._c01 + dt * self._c11) + self.q * dt ** 4 / 4
+        c01 = self._c01 + dt * self._c11 + self.q * dt ** 3 / 2
+        c11 = self._c11 + self.q * dt ** 2
+        # Update, with less trust in low-visibility landmarks
+        r = self.r / np.clip(visibility, 0.05, 1.0)
+        k0 = c00 / (c00 + r)
+        k1 = c01 / (c00 + r)
+        innovation = measured - p
+        self._p = np.where(visible, p + k0 * innovation, p)
+        self._v = np.where(visible, self._v + k1 * innovation, self._v)
+        self._c00 = np.where(visible, (1 - k0) * c00, c00)
+        self._c01 = np.where(visible, (1 - k0) * c01, c01)
+        self._c11 = np.where(visible, c11 - k1 * c01, c11)
+
+    def estimate(self):
+        return self._p
+
+
+FILTERS = {
+    "one-euro": OneEuroFilter,
+    "kalman": KalmanFilter,
+}
+
+
+def make_filter(name, **kwargs):
+    """Builds a landmark filter by name; returns None for "none"/None (no smoothing)."""
+    if not name or name == "none":
+        return None
+    if name not in FILTERS:
+        raise ValueError(f"unknown landmark filter {name!r}; choose from {sorted(FILTERS)}")
+    return FILTERS[name](**kwargs)
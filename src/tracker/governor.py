@@ -0,0 +1,127 @@
+import json
+import os
+import threading
+import time
+
+from storage.session_log import LOG_DIR
+
+GOVERNOR_LOG = os.path.join(LOG_DIR, 'governor.jsonl')
+
+# Pose settings from cheapest to most accurate: (model_complexity, inference_width); None = full frame width
+LEVELS = (
+    (0, 256),
+    (0, 384),
+    (0, None),
+    (1, 384),
+    (1, None),
+    (2, None),
+)
+
+
+def with_level(levels, level):
+    """`levels` with `level` added in cost order (by model, then width; None = full frame) if it isn't there already."""
+    levels = tuple(levels)
+    if level in levels: return levels
+    cost = lambda item: (item[0], float("inf") if item[1] is None else item[1])
+    return tuple(sorted(levels + (level,), key=cost))
+
+
+class InferenceGovernor:
+    """
+    Holds a target inference frame rate by moving a PoseDetector up and down LEVELS.
+
+    `observe()` is fed every find_pose duration. Once a full window of samples has been seen since
+    the last switch, the median is compared with the frame budget (1 / target_fps): over budget steps
+    down a level, under `headroom` x budget steps up. The gap between the two is the hysteresis band,
+    and `cooldown` seconds must pass between switches. A level that was just abandoned for being too
+    slow is only retried after `retry_after` seconds, so the governor doesn't oscillate around it.
+    The detector's own settings are always a level (see with_level), and the governor starts there.
+    The other models on the ladder are built on a background thread, and a switch waits until its
+    model is ready rather than stalling inference while MediaPipe builds the graph.
+    The starting level and every switch are appended as JSON lines to logs/governor.jsonl.
+    """
+    def __init__(self, detector, target_fps, levels=LEVELS, window=30, headroom=0.6, cooldown=5.0, retry_after=60.0,
+                 log_file=GOVERNOR_LOG):
+        self.detector = detector
+        self.target_fps = target_fps
+        current = (detector.model_complexity, detector.inference_width)
+        self.levels = with_level(levels, current)
+        self.window = window
+        self.headroom = headroom
+        self.cooldown = cooldown
+        self.retry_after = retry_after
+        self.log_file = log_file
+        self._samples = []
+        self._switched_at = time.monotonic()
+        self._blocked_until = {} # level -> monotonic time before which stepping up into it is not allowed
+        self.switches = 0
+        self.level = self.levels.index(current)
+        self._apply(self.level)
+        # Nearest models first: they are the ones the first switches need
+        complexities = sorted({c for c, _ in self.levels}, key=lambda c: abs(c - detector.model_complexity))
+        threading.Thread(target=detector.prepare_models, args=(complexities,), name="fitcount-pose-models",
+                         daemon=True).start()
+        self._log({"to": self._describe(self.level), "budget_ms": round(1000 * self.budget, 2),
+                   "target_fps": target_fps, "reason": "start"})
+
+    @property
+    def budget(self):
+        return 1.0 / self.target_fps
+
+    def observe(self, seconds, now=None):
+        """
+        Records one inference duration and switches level if needed; returns True if it switched.
+        Must run on the inference thread, since switching rebuilds/replaces the detector's model.
+        """
+        self._samples.append(seconds)
+        if len(self._samples) < self.window: return False
+        now = time.monotonic() if now is None else now
+        if now - self._switched_at < self.cooldown:
+            del self._samples[0]
+            return False
+        median = sorted(self._samples)[len(self._samples) // 2]
+        self._samples.clear()
+        target = self.level
+        if median > self.budget and self.level > 0:
+            target = self.level - 1
+        elif median < self.headroom * self.budget and self.level < len(self.levels) - 1:
+            if self._blocked_until.get(self.level + 1, 0.0) <= now:
+                target = self.level + 1
+        if target == self.level: return False
+        if not self.detector.model_ready(self.levels[target][0]):
+            return False # Still being built; the next window tries again
+        self._switch(target, median, now)
+        return True
+
+    def _switch(self, level, median, now):
+        previous = self.level
+        if level < previous: self._blocked_until[previous] = now + self.retry_after
+        self._apply(level)
+        self.level = level
+        self._switched_at = now
+        self.switches += 1
+        self._log({"from": self._describe(previous), "to": self._describe(level),
+                   "median_inference_ms": round(1000 * median, 2), "budget_ms": round(1000 * self.budget, 2),
+                   "target_fps": self.target_fps, "reason": "over budget" if level < previous else "headroom"})
+
+    def _apply(self, level):
+        model_complexity, inference_width = self.levels[level]
+        self.detector.set_model_complexity(model_complexity)
+        self.detector.inference_width = inference_width
+
+    def _describe(self, level):
+        model_complexity, inference_width = self.levels[level]
+        return {"level": level, "model_complexity": model_complexity, "inference_width": inference_width}
+
+    def _log(self, entry):
+        if not self.log_file: return
+        if os.path.dirname(self.log_file): os.makedirs(os.path.dirname(self.log_file), exist_ok=True)
+        entry = {"timestamp": time.strftime("%Y-%m-%d %H:%M:%S"), **entry}
+        with open(self.log_file, 'a') as f:
+            f.write(json.dumps(entry) + "\n")
+
+    def stats(self):
+        """Current level for RuntimeMetrics snapshots (inference_width 0 = full frame)."""
+        model_complexity, inference_width = self.levels[self.level]
+        return {"governor_level": self.level, "model_complexity": model_complexity,
+                "inference_width": inference_width or 0, "governor_switches": self.switches}
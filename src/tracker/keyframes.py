@@ -0,0 +1,110 @@
+import cv2
+import numpy as np
+
+
+class KeyframePropagator:
+    """
+    Carries pose landmarks between pose-model runs ("keyframes") with sparse optical flow.
+
+    After each keyframe the landmarks are tracked frame to frame with pyramidal Lucas-Kanade
+    flow on a grayscale image, and the MediaPipe result is updated in place, so drawing and
+    PoseDetector.get_landmarks work unchanged. The keyframe interval adapts to motion: at or
+    above `fast_motion` every frame is a keyframe, at or below `still_motion` only every
+    `max_interval`-th frame is. Motion is the per-frame displacement of the fastest-moving visible
+    landmarks (the second largest, so one bad flow vector can't trigger it, while a curl still counts
+    as motion although most of the body is still), as a fraction of the frame width. A keyframe is
+    also forced as soon as flow loses more than `1 - min_tracked` of the visible landmarks, and on
+    every frame while nobody is in view, so a person stepping in is picked up at once.
+    """
+    def __init__(self, max_interval=6, still_motion=0.002, fast_motion=0.012, min_tracked=0.7, min_visibility=0.5,
+                 win_size=21, max_level=3):
+        self.max_interval = max_interval
+        self.still_motion = still_motion
+        self.fast_motion = fast_motion
+        self.min_tracked = min_tracked
+        self.min_visibility = min_visibility
+        self.lk_params = dict(winSize=(win_size, win_size), maxLevel=max_level,
+                              criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 20, 0.03))
+        self.interval = 1
+        self.motion = 0.0
+        self.keyframes = 0
+        self.propagated = 0
+        self._since_keyframe = 0
+        self._prev_gray = None
+        self._points = None # (33, 1, 2) float32 pixel positions on the previous frame
+        self._key_points = None # positions on the last keyframe, to measure motion across keyframes
+        self._visible = None
+
+    def needs_keyframe(self):
+        return self._prev_gray is None or self._since_keyframe + 1 >= self.interval
+
+    def keyframe(self, img, results, rgb=False):
+        """Call after the pose model ran on `img`; resets tracking to its landmarks and adapts the interval."""
+        self.keyframes += 1
+        frames = self._since_keyframe + 1
+        self._since_keyframe = 0
+        self._prev_gray = cv2.cvtColor(img, cv2.COLOR_RGB2GRAY if rgb else cv2.COLOR_BGR2GRAY)
+        if not results.pose_landmarks:
+            # Nobody in view: there is nothing to carry over, so run the model on the next frame too
+            self._points = self._key_points = None
+            self.interval = 1
+            return
+        h, w = img.shape[:2]
+        landmarks = results.pose_landmarks.landmark
+        points = np.array([(lm.x * w, lm.y * h) for lm in landmarks], dtype=np.float32).reshape(-1, 1, 2)
+        self._visible = np.array([lm.visibility >= self.min_visibility for lm in landmarks])
+        if self._key_points is not None and self._visible.any():
+            # Flow between keyframes drifts; the model's own landmarks are the better motion estimate
+            step = np.linalg.norm(points[self._visible, 0] - self._key_points[self._visible, 0], axis=1) / frames
+            self._update_interval(self._fastest(step) / w)
+        self._points = points
+        self._key_points = points.copy()
+
+    def propagate(self, img, results, rgb=False):
+        """
+        Moves the last landmarks onto `img` without running the model. Returns False when
+        a keyframe is due instead (the caller should then run the model and call keyframe()).
+        """
+        if self.needs_keyframe(): return False
+        gray = cv2.cvtColor(img, cv2.COLOR_RGB2GRAY if rgb else cv2.COLOR_BGR2GRAY)
+        if gray.shape != self._prev_gray.shape: return False
+        if self._points is not None and results.pose_landmarks:
+            points, status, _ = cv2.calcOpticalFlowPyrLK(self._prev_gray, gray, self._points, None, **self.lk_params)
+            tracked = status.ravel() == 1
+            if self._visible.any() and tracked[self._visible].mean() < self.min_tracked:
+                return False
+            h, w = img.shape[:2]
+            moved = tracked & self._visible
+            if moved.any():
+                step = np.linalg.norm(points[moved, 0] - self._points[moved, 0], axis=1)
+                if self._fastest(step) / w >= self.fast_motion:
+                    # Fast movement started between keyframes - the next frame gets the model
+                    self.interval = self._since_keyframe + 2
+            self._points[tracked] = points[tracked]
+            for i, lm in enumerate(results.pose_landmarks.landmark):
+                if tracked[i]:
+                    lm.x = float(self._points[i, 0, 0]) / w
+                    lm.y = float(self._points[i, 0, 1]) / h
+        self._prev_gray = gray
+        self._since_keyframe += 1
+        self.propagated += 1
+        return True
+
+    @staticmethod
+    def _fastest(step):
+        return float(np.partition(step, -2)[-2]) if step.size > 1 else float(step[0])
+
+    def _update_interval(self, motion):
+        self.motion = motion
+        if motion >= self.fast_motion:
+            self.interval = 1
+        elif motion <= self.still_motion:
+            self.interval = self.max_interval
+        else:
+            share = (self.fast_motion - motion) / (self.fast_motion - self.still_motion)
+            self.interval = max(1, int(round(1 + share * (self.max_interval - 1))))
+
+    def stats(self):
+        total = self.keyframes + self.propagated
+        return {"keyframe_ratio": self.keyframes / total if total else 0.0, "keyframe_interval": self.interval,
+                "motion": self.motion}
@@ -0,0 +1,73 @@
+import numpy as np
+
+from tracker.angle_utils import calculate_angles
+
+# MediaPipe's POSE_CONNECTIONS as an index array, so drawing needs no MediaPipe objects
+POSE_CONNECTIONS = np.array([
+    (0, 1), (1, 2), (2, 3), (3, 7), (0, 4), (4, 5), (5, 6), (6, 8), (9, 10),     # face
+    (11, 12), (11, 23), (12, 24), (23, 24),                                     # torso
+    (11, 13), (13, 15), (15, 17), (15, 19), (15, 21), (17, 19),                 # left arm and hand
+    (12, 14), (14, 16), (16, 18), (16, 20), (16, 22), (18, 20),                 # right arm and hand
+    (23, 25), (25, 27), (27, 29), (27, 31), (29, 31),                           # left leg and foot
+    (24, 26), (26, 28), (28, 30), (28, 32), (30, 32),                           # right leg and foot
+], dtype=np.intp)
+
+NUM_LANDMARKS = 33
+OVERLAY_MODES = ("full", "exercise", "angles", "off")
+
+
+class SkeletonOverlay:
+    """
+    Draws the pose skeleton from array landmarks (PoseDetector.get_landmarks) in two OpenCV calls.
+
+    Every visible segment goes into one cv2.polylines call, and the joint dots into a second one as
+    zero-length segments, which OpenCV's round line caps turn into filled circles. Landmarks below
+    `min_visibility` are left out, as MediaPipe's draw_landmarks does.
+
+    mode: "full" draws the whole skeleton, "exercise" only the limbs of the current exercise's joints
+          (see set_joints), "angles" adds the measured angle next to each of those joints, "off" draws nothing.
+    Colours are given as BGR and swapped for RGB images.
+    """
+    def __init__(self, mode="full", min_visibility=0.5, line_color=(224, 224, 224), point_color=(0, 0, 255),
+                 thickness=2, radius=3):
+        if mode not in OVERLAY_MODES:
+            raise ValueError(f"overlay mode must be one of {OVERLAY_MODES}, got {mode!r}")
+        self.mode = mode
+        self.min_visibility = min_visibility
+        self.line_color = line_color
+        self.point_color = point_color
+        self.thickness = thickness
+        self.radius = radius
+        self._xy = np.zeros((NUM_LANDMARKS, 2), dtype=np.int32)
+        self.set_joints(None)
+
+    def set_joints(self, joints):
+        """Sets the current exercise's (first, vertex, last) triplets, used by the "exercise" and "angles" modes."""
+        self.joints = np.empty((0, 3), dtype=np.intp) if joints is None else np.asarray(joints, dtype=np.intp).reshape(-1, 3)
+        if self.mode == "full":
+            self._connections = POSE_CONNECTIONS
+        else:
+            # Each triplet is two limbs: first-vertex and vertex-last
+            self._connections = self.joints[:, [0, 1, 1, 2]].reshape(-1, 2)
+        self._points = np.unique(self._connections)
+
+    def draw(self, img, landmarks, rgb=False):
+        """Draws onto `img` in place and returns it; `landmarks` is a (33, 4) [x_px, y_px, z, visibility] array."""
+        if self.mode == "off" or landmarks is None or not len(self._connections): return img
+        import cv2 # Not at module level: detector_options reads OVERLAY_MODES before the first paint, ahead of OpenCV
+        line_color, point_color = (self.line_color[::-1], self.point_color[::-1]) if rgb else (self.line_color, self.point_color)
+        np.copyto(self._xy, landmarks[:, :2], casting="unsafe")
+        visible = landmarks[:, 3] >= self.min_visibility
+        connections = self._connections[visible[self._connections].all(axis=1)]
+        if len(connections):
+            cv2.polylines(img, self._xy[connections], False, line_color, self.thickness)
+        points = self._points[visible[self._points]]
+        if len(points):
+            cv2.polylines(img, self._xy[np.repeat(points, 2).reshape(-1, 2)], False, point_color, 2 * self.radius)
+        if self.mode == "angles":
+            for (_, vertex, _), angle in zip(self.joints, calculate_angles(landmarks, self.joints)):
+                if not visible[vertex]: continue
+                x, y = self._xy[vertex]
+                cv2.putText(img, f"{angle:.0f}", (int(x) + 10, int(y) - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.7,
+                            point_color, 2)
+        return img
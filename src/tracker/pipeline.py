@@ -0,0 +1,189 @@
+import threading
+import time
+
+import cv2
+
+
+class LatestSlot:
+    """
+    A single-item, thread-safe hand-off slot.
+    Putting a new item overwrites any item that was never taken, so the
+    consumer always sees the freshest data and stale frames are dropped.
+    """
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._item = None
+        self._seq = 0
+        self.dropped = 0
+
+    def put(self, item):
+        with self._cond:
+            if self._item is not None:
+                self.dropped += 1
+            self._item = item
+            self._seq += 1
+            self._cond.notify()
+
+    def take(self, timeout=None):
+        """Removes and returns the latest item, waiting up to `timeout` seconds (None = don't wait)."""
+        with self._cond:
+            if self._item is None and timeout is not None:
+                self._cond.wait(timeout)
+            item, self._item = self._item, None
+            return item
+
+
+class FrameResult:
+    """
+    A finished frame (RGB, with the skeleton drawn) handed from the inference worker to the UI thread.
+    `landmarks` are filtered when the pipeline has a landmark filter; `raw_landmarks` are the detector's own.
+    """
+    __slots__ = ("frame", "landmarks", "raw_landmarks", "inferred", "captured_at", "inferred_at", "seq")
+
+    def __init__(self, frame, landmarks, inferred, captured_at, inferred_at, seq, raw_landmarks=None):
+        self.frame = frame
+        self.inferred = inferred
+        self.landmarks = landmarks
+        self.raw_landmarks = landmarks if raw_landmarks is None else raw_landmarks
+        self.captured_at = captured_at
+        self.inferred_at = inferred_at
+        self.seq = seq
+
+
+class FramePipeline:
+    """
+    Runs camera capture and pose inference on background threads.
+
+    capture thread -> [capture slot] -> inference worker -> [result slot] -> UI
+    Both slots are latest-wins, so a slow stage drops frames instead of queueing them.
+    The UI polls `latest_result()` and only ever touches finished results.
+    `cap` needs cv2.VideoCapture's grab()/retrieve(), so the "capture" stage excludes the wait for the next frame.
+    An optional `landmark_filter` (see tracker.filters) smooths landmarks on the worker thread, and an
+    optional `governor` (tracker.governor.InferenceGovernor) is fed every inference time to hold a target FPS.
+    """
+    def __init__(self, cap, detector, inference_enabled=lambda: True, flip=True, latency_window=120, metrics=None,
+                 landmark_filter=None, governor=None, profiler=None, overlay_joints=lambda: None):
+        self.cap = cap
+        self.metrics = metrics
+        self.detector = detector
+        self.landmark_filter = landmark_filter
+        self.governor = governor
+        self.profiler = profiler # Optional perf.profiling.ProfileCapture the inference thread joins
+        self.inference_enabled = inference_enabled
+        # Joints of the current exercise for the detector's skeleton overlay, polled once per inferred frame
+        self.overlay_joints = overlay_joints
+        self._overlay_joints = None
+        self.flip = flip
+        self.capture_slot = LatestSlot()
+        self.result_slot = LatestSlot()
+        self.frames_captured = 0
+        self.frames_inferred = 0
+        self.read_failures = 0
+        self.error = None # Why the pipeline can't deliver frames, for the UI (see tracker.shm_pipeline)
+        self._latencies = [0.0] * latency_window
+        self._latency_count = 0
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self, inference_thread=True):
+        """Starts capturing; pass inference_thread=False to take frames from `capture_slot` and call process() yourself."""
+        # Threads of an earlier stop() may still be finishing (e.g. blocked in cap.read); never run two sets
+        self._threads = [t for t in self._threads if t.is_alive()]
+        if self._threads: return
+        self._stop.clear()
+        self._threads = [threading.Thread(target=self._capture_loop, name="fitcount-capture", daemon=True)]
+        if inference_thread:
+            self._threads.append(threading.Thread(target=self._inference_loop, name="fitcount-inference", daemon=True))
+        for t in self._threads: t.start()
+
+    def stop(self):
+        """Asks the threads to finish without waiting for them (safe on the UI thread); start() resumes once they have."""
+        self._stop.set()
+
+    def close(self, timeout=1.0):
+        """Stops and waits for the threads; call before releasing the capture."""
+        self._stop.set()
+        for t in self._threads: t.join(timeout)
+        self._threads = [t for t in self._threads if t.is_alive()]
+
+    def is_running(self):
+        return bool(self._threads) and not self._stop.is_set()
+
+    def _capture_loop(self):
+        seq = 0
+        while not self._stop.is_set():
+            if self.profiler: self.profiler.sync_thread()
+            # grab() waits for the camera's next frame; only retrieve() (decode/convert) counts as capture cost
+            grabbed = self.cap.grab()
+            start = time.perf_counter()
+            success, frame = self.cap.retrieve() if grabbed else (False, None)
+            if self.metrics and success: self.metrics.record("capture", time.perf_counter() - start)
+            if not success:
+                self.read_failures += 1
+                time.sleep(0.01)
+                continue
+            seq += 1
+            self.frames_captured += 1
+            self.capture_slot.put((frame, time.perf_counter(), seq))
+
+    def _inference_loop(self):
+        while not self._stop.is_set():
+            if self.profiler: self.profiler.sync_thread()
+            item = self.capture_slot.take(timeout=0.1)
+            if item is None: continue
+            self.result_slot.put(self.process(*item))
+
+    def process(self, frame, captured_at, seq, out=None):
+        """
+        Flips, converts and runs pose inference on one captured BGR frame and returns its FrameResult.
+        With `out` (an RGB array of the frame's shape) the converted frame is written there instead of a new array.
+        """
+        if self.flip:
+            frame = cv2.flip(frame, 1)
+        # The one colour conversion per frame: inference and display both use this RGB image
+        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=out)
+        landmarks = raw = None
+        inferred = self.inference_enabled()
+        if inferred:
+            joints = self.overlay_joints()
+            if joints is not self._overlay_joints:
+                self._overlay_joints = joints
+                self.detector.overlay.set_joints(joints)
+            start = time.perf_counter()
+            frame = self.detector.find_pose(frame, draw=True, rgb=True)
+            # Frames whose landmarks were propagated between keyframes say nothing about the model's cost
+            if self.governor and self.detector.inferred: self.governor.observe(time.perf_counter() - start)
+            raw = self.detector.get_landmarks(frame)
+            if raw is not None:
+                # The detector (and the filter) reuse their buffers, so hand the UI its own copies
+                raw = raw.copy()
+            landmarks = raw
+            if self.landmark_filter and raw is not None:
+                landmarks = self.landmark_filter(raw, captured_at).copy()
+            self.frames_inferred += 1
+        return FrameResult(frame, landmarks, inferred, captured_at, time.perf_counter(), seq, raw)
+
+    def latest_result(self):
+        """Returns the newest finished FrameResult, or None if nothing new is ready."""
+        return self.result_slot.take()
+
+    def record_latency(self, result):
+        """Records capture-to-consumption latency for a result the UI has just applied."""
+        latency = time.perf_counter() - result.captured_at
+        self._latencies[self._latency_count % len(self._latencies)] = latency
+        self._latency_count += 1
+        return latency
+
+    def stats(self):
+        """Returns frame counters, drop counts and end-to-end latency (ms) over the recent window."""
+        n = min(self._latency_count, len(self._latencies))
+        window = sorted(self._latencies[:n])
+        return {
+            "captured": self.frames_captured,
+            "inferred": self.frames_inferred,
+            "read_failures": self.read_failures,
+            "dropped_before_inference": self.capture_slot.dropped,
+            "dropped_before_display": self.result_slot.dropped,
+            "latency_ms_avg": 1000 * sum(window) / n if n else 0.0,
+            "latency_ms_max": 1000 * window[-1] if n else 0.0,
+        }
@@ -1,33 +1,186 @@
+import threading
+import time
+
 import cv2
 import mediapipe as mp
+import numpy as np
+
+from tracker.keyframes import KeyframePropagator
+from tracker.overlay import SkeletonOverlay
+
+NUM_LANDMARKS = 33
 
 class PoseDetector:
     """
     MediaPipe Pose detector class.
     Encapsulates finding and drawing pose landmarks.
+
+    inference_width: if set, frames wider than this are downscaled before inference.
+    roi: if True, inference runs on a padded box around the person, falling back to the full frame whenever
+         tracking is lost. The box stays put while the person is well inside it (see _next_roi).
+    model_complexity, smooth_landmarks, enable_segmentation, smooth_segmentation: passed to mediapipe Pose
+         (complexity 0 = lite, 1 = full, 2 = heavy).
+    keyframes: if True, the model only runs on keyframes and landmarks are carried between them with
+         optical flow (see tracker.keyframes); the interval adapts to motion, up to `max_keyframe_interval`.
+    overlay: how find_pose draws the skeleton (tracker.overlay.OVERLAY_MODES); the exercise modes draw
+         the joints given to `overlay.set_joints`.
+    Landmarks are always reported in full-frame coordinates, whichever mode is used.
     """
-    def __init__(self, detection_con=0.5, track_con=0.5):
+    def __init__(self, detection_con=0.5, track_con=0.5, inference_width=None, roi=False, roi_padding=0.25,
+                 roi_min_visibility=0.5, model_complexity=1, smooth_landmarks=True, enable_segmentation=False,
+                 smooth_segmentation=True, keyframes=False, max_keyframe_interval=6, overlay="full"):
         self.mp_pose = mp.solutions.pose
-        self.pose = self.mp_pose.Pose(min_detection_confidence=detection_con, min_tracking_confidence=track_con)
+        self.detection_con = detection_con
+        self.track_con = track_con
+        self.smooth_landmarks = smooth_landmarks
+        self.enable_segmentation = enable_segmentation
+        self.smooth_segmentation = smooth_segmentation
+        self._models = {} # model_complexity -> Pose, so switching back and forth doesn't reload the graph
+        self._models_lock = threading.Lock()
+        self.model_complexity = None
+        self.set_model_complexity(model_complexity)
         self.mp_draw = mp.solutions.drawing_utils
+        self.overlay = SkeletonOverlay(overlay)
+        self.inference_width = inference_width
+        self.roi = roi
+        self.roi_padding = roi_padding
+        self.roi_min_visibility = roi_min_visibility
+        self.roi_box = None # (x0, y0, x1, y1) in pixels for the next frame, None = full frame
+        self.keyframes = KeyframePropagator(max_interval=max_keyframe_interval) if keyframes else None
+        self.inferred = False # Whether the last find_pose ran the model (False = landmarks were propagated)
+        self.results = None
+        self.metrics = None # Optional perf.metrics.RuntimeMetrics; find_pose is timed as "inference"
+        # Reused on every frame: rows are [x_px, y_px, z, visibility]
+        self._landmarks = np.zeros((NUM_LANDMARKS, 4), dtype=np.float32)
+        self._landmarks_of = None # (results, frame shape) that _landmarks was filled from
+
+    def set_model_complexity(self, model_complexity):
+        """
+        Switches the pose model (0, 1 or 2). Models are built on first use and kept, so later switches are cheap;
+        building one takes a while, so see prepare_models. Call it from the thread that runs find_pose.
+        """
+        if model_complexity == self.model_complexity: return
+        cached = self.model_ready(model_complexity)
+        self.pose = self._model(model_complexity)
+        # A model used before still tracks the pose it last saw, which may be seconds old
+        if cached: self.pose.reset()
+        self.model_complexity = model_complexity
+        self.roi_box = None # Start again from a full-frame detection
+        self.results = None
+
+    def prepare_models(self, complexities):
+        """Builds the models for `complexities` ahead of set_model_complexity; safe to run on another thread."""
+        for model_complexity in complexities: self._model(model_complexity)
 
-    def find_pose(self, img, draw=True):
-        """Finds pose landmarks in an image and draws them."""
-        img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        self.results = self.pose.process(img_rgb)
+    def model_ready(self, model_complexity):
+        return model_complexity in self._models
+
+    def _model(self, model_complexity):
+        with self._models_lock:
+            if model_complexity not in self._models:
+                self._models[model_complexity] = self.mp_pose.Pose(
+                    model_complexity=model_complexity, smooth_landmarks=self.smooth_landmarks,
+                    enable_segmentation=self.enable_segmentation, smooth_segmentation=self.smooth_segmentation,
+                    min_detection_confidence=self.detection_con, min_tracking_confidence=self.track_con)
+            return self._models[model_complexity]
+
+    def find_pose(self, img, draw=True, rgb=False):
+        """
+        Finds pose landmarks in an image and draws them.
+        Pass rgb=True for an image that is already RGB; it skips the colour conversion and draws in RGB colours.
+        """
+        start = time.perf_counter()
+        self._landmarks_of = None # Propagation updates the results in place
+        self.inferred = not (self.keyframes and self.results is not None and self.keyframes.propagate(img, self.results, rgb))
+        if self.inferred:
+            box = self.roi_box if self.roi else None
+            self.results = self._process(img, box, rgb)
+            if box is not None and not self.results.pose_landmarks:
+                # Lost the person inside the crop - search the whole frame again
+                self.results = self._process(img, None, rgb)
+                self.roi_box = None
+            if self.keyframes: self.keyframes.keyframe(img, self.results, rgb)
+        if self.roi:
+            self.roi_box = self._next_roi(img.shape)
         
-        if self.results.pose_landmarks and draw:
-            self.mp_draw.draw_landmarks(img, self.results.pose_landmarks, self.mp_pose.POSE_CONNECTIONS)
+        # Filled here once per frame; get_landmarks hands the same array to the caller
+        landmarks = self.get_landmarks(img)
+        if landmarks is not None and draw and self.overlay.mode != "off":
+            self.overlay.draw(img, landmarks, rgb)
         
+        if self.metrics: self.metrics.record("inference", time.perf_counter() - start)
         return img
 
+    def _process(self, img, box, rgb=False):
+        """Runs the model on `img` (optionally cropped to `box` and downscaled) and maps landmarks back to `img`."""
+        h, w = img.shape[:2]
+        x0, y0, x1, y1 = box if box is not None else (0, 0, w, h)
+        crop = img[y0:y1, x0:x1]
+        cw, ch = x1 - x0, y1 - y0
+        if self.inference_width and cw > self.inference_width:
+            crop = cv2.resize(crop, (self.inference_width, max(1, ch * self.inference_width // cw)),
+                              interpolation=cv2.INTER_AREA)
+        results = self.pose.process(crop if rgb else cv2.cvtColor(crop, cv2.COLOR_BGR2RGB))
+        if results.pose_landmarks and box is not None:
+            # Normalized crop coordinates -> normalized full-frame coordinates (resizing doesn't change them)
+            for lm in results.pose_landmarks.landmark:
+                lm.x = (x0 + lm.x * cw) / w
+                lm.y = (y0 + lm.y * ch) / h
+                lm.z = lm.z * cw / w # z is on the same scale as x
+        return results
+
+    def _next_roi(self, shape):
+        """
+        Crop for the next frame: a padded bounding box of the confidently visible landmarks, or None to
+        search the full frame. MediaPipe tracks from its previous landmarks in crop coordinates, so
+        moving the crop under it every frame makes the landmarks jitter. The current box is therefore
+        kept while the landmarks stay at least half the padding away from its inner edges, and when
+        the box does change the model is reset to detect the person afresh inside the new one.
+        """
+        h, w = shape[:2]
+        bounds = self._landmark_bounds()
+        if bounds is None:
+            box = None
+        else:
+            left, top, right, bottom, pad = bounds
+            if self.roi_box is not None:
+                x0, y0, x1, y1 = self.roi_box
+                margin = pad / 2
+                if ((x0 == 0 or left - margin >= x0 / w) and (y0 == 0 or top - margin >= y0 / h)
+                        and (x1 == w or right + margin <= x1 / w) and (y1 == h or bottom + margin <= y1 / h)):
+                    return self.roi_box
+            x0, x1 = max(0, int((left - pad) * w)), min(w, int((right + pad) * w))
+            y0, y1 = max(0, int((top - pad) * h)), min(h, int((bottom + pad) * h))
+            box = (x0, y0, x1, y1) if x1 - x0 >= 32 and y1 - y0 >= 32 else None
+        if box != self.roi_box: self.pose.reset()
+        return box
+
+    def _landmark_bounds(self):
+        """(left, top, right, bottom, padding) of the confidently visible landmarks, normalized; None if too few."""
+        if not self.results.pose_landmarks: return None
+        points = [(lm.x, lm.y) for lm in self.results.pose_landmarks.landmark if lm.visibility >= self.roi_min_visibility]
+        if len(points) < 4: return None
+        xs, ys = zip(*points)
+        pad = self.roi_padding * max(max(xs) - min(xs), max(ys) - min(ys))
+        return min(xs), min(ys), max(xs), max(ys), pad
+
     def get_landmarks(self, img):
-        """Extracts landmark coordinates from the detected pose."""
-        landmarks = []
-        if self.results.pose_landmarks:
-            for id, lm in enumerate(self.results.pose_landmarks.landmark):
-                h, w, c = img.shape
-                # Get pixel coordinates
-                cx, cy = int(lm.x * w), int(lm.y * h)
-                landmarks.append([id, cx, cy])
-        return landmarks
\ No newline at end of file
+        """
+        Extracts landmarks from the detected pose.
+        Returns a (33, 4) float32 array of [x, y, z, visibility] with x/y in pixels,
+        or None if no pose was found. The array is reused on the next call, so copy it to keep it.
+        After find_pose this is the array it already filled for the frame.
+        """
+        if self.results is None or not self.results.pose_landmarks:
+            return None
+        h, w = img.shape[:2]
+        landmarks = self._landmarks
+        if self._landmarks_of is not None and self._landmarks_of[0] is self.results and self._landmarks_of[1] == (h, w):
+            return landmarks
+        self._landmarks_of = (self.results, (h, w))
+        for i, lm in enumerate(self.results.pose_landmarks.landmark):
+            landmarks[i] = (lm.x, lm.y, lm.z, lm.visibility)
+        # Get pixel coordinates
+        landmarks[:, 0] *= w
+        landmarks[:, 1] *= h
+        return landmarks
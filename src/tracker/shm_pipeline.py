@@ -0,0 +1,287 @@
+import multiprocessing
+import threading
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from tracker.pipeline import FrameResult
+
+
+class StageTimings:
+    """Stands in for RuntimeMetrics in the pose process; the timings travel with each frame and are recorded in the UI."""
+    def __init__(self):
+        self.items = []
+
+    def record(self, stage, seconds):
+        self.items.append((stage, seconds))
+
+    def drain(self):
+        items, self.items = self.items, []
+        return items
+
+
+class ProcessPipeline:
+    """
+    FramePipeline's interface, with capture and pose inference in a separate process.
+
+    pose process: capture thread -> [capture slot] -> FramePipeline.process -> frame slot i
+    UI process:   receiver thread -> [latest result] -> UI
+
+    Frames travel through a shared-memory ring of `slots` preallocated RGB frames: the worker
+    converts each captured frame straight into a free slot, and only the slot index, the landmark
+    arrays, stage timings and (once a second) the worker's counters are sent over a pipe. A slot goes
+    back to the worker when the UI has moved on to a newer frame or the frame was dropped unseen, so
+    the worker never writes a frame the UI is reading. The current exercise's joints for the skeleton
+    overlay go the other way whenever they change. Rep counting stays in the UI process: it is a
+    single vectorized pass per frame, and the UI owns the workout state.
+
+    `capture` (a picklable callable returning a cv2.VideoCapture-like source; camera 0 by default),
+    `detector_options`, `landmark_filter` and `target_fps` (for an InferenceGovernor) are handed to
+    the worker, which is started with the spawn method so it never inherits Tk or the UI's threads.
+    open() blocks until the worker has opened the source and loaded the model. stop() only pauses the
+    receiver and inference (the worker, the ring and the pipe stay up for the next start()); close()
+    shuts the worker down. If the worker dies, `error` says so. Profile captures only cover the UI process.
+    """
+    def __init__(self, capture=None, detector_options=None, inference_enabled=lambda: True, flip=True,
+                 latency_window=120, metrics=None, landmark_filter=None, target_fps=None, slots=4, profiler=None,
+                 ready_timeout=120.0, overlay_joints=lambda: None):
+        self.capture = capture
+        self.detector_options = detector_options or {}
+        self.inference_enabled = inference_enabled
+        self.overlay_joints = overlay_joints
+        self._sent_joints = None
+        self.flip = flip
+        self.metrics = metrics
+        self.landmark_filter = landmark_filter
+        self.target_fps = target_fps
+        self.slots = slots
+        self.profiler = profiler
+        self.ready_timeout = ready_timeout
+        self.error = None
+        self.dropped = 0
+        self.worker_stats = {}
+        self._latencies = [0.0] * latency_window
+        self._latency_count = 0
+        self._context = multiprocessing.get_context("spawn")
+        self._enabled = self._context.Value("b", 0, lock=False)
+        self._worker_stop = self._context.Event()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._process = None
+        self._conn = None
+        self._shm = None
+        self._frames = None
+        self._thread = None
+        self._pending = None # (FrameResult, slot) received but not yet taken by the UI
+        self._held = None # slot of the frame the UI took last
+
+    def open(self):
+        """Starts the pose process and waits until it is ready; returns an error message, or None on success."""
+        self._conn, child = self._context.Pipe()
+        self._process = self._context.Process(
+            target=run_worker, name="fitcount-pose", daemon=True,
+            args=(child, self.capture, self.detector_options, self.flip, self.landmark_filter, self.target_fps,
+                  self._enabled, self._worker_stop))
+        self._process.start()
+        child.close()
+        try:
+            if not self._conn.poll(self.ready_timeout):
+                raise EOFError("timed out")
+            kind, value = self._conn.recv()
+        except (EOFError, OSError) as e:
+            kind, value = "error", f"pose process did not start ({e or 'exited'})"
+        if kind == "error":
+            self.error = value
+            self.close()
+            return value
+        self._shm = shared_memory.SharedMemory(create=True, size=self.slots * int(np.prod(value)))
+        self._frames = np.ndarray((self.slots, *value), dtype=np.uint8, buffer=self._shm.buf)
+        self._conn.send(self._shm.name)
+        return None
+
+    def start(self):
+        if self._frames is None: return
+        if not self._process.is_alive():
+            self.error = self.error or "pose process exited"
+            return
+        # A receiver from an earlier stop() finishes within one poll interval; the UI retries until it has
+        if self._thread and self._thread.is_alive(): return
+        with self._lock:
+            stale, self._pending = self._pending, None
+        if stale: self._send(stale[1]) # Left over from before the pause
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._receive_loop, name="fitcount-pose-receiver", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Pauses without waiting: the receiver exits and the worker stops running the model."""
+        self._stop.set()
+        self._enabled.value = 0
+
+    def close(self, timeout=2.0):
+        """Shuts the worker down and frees the ring; blocks for up to 2 x `timeout`, so keep it off the UI thread."""
+        self._stop.set()
+        self._worker_stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+        if self._process:
+            self._process.join(timeout)
+            if self._process.is_alive(): self._process.terminate()
+        self._pending = self._held = None
+        self._frames = None
+        if self._shm:
+            try:
+                self._shm.close()
+            except BufferError:
+                pass # A frame view is still referenced somewhere; the mapping goes away with the process
+            self._shm.unlink()
+            self._shm = None
+        if self._conn: self._conn.close()
+
+    def pid(self):
+        """Process id of the pose process, or None when it isn't running."""
+        return self._process.pid if self._process is not None and self._process.is_alive() else None
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive() and not self._stop.is_set()
+
+    def _receive_loop(self):
+        try:
+            self._receive()
+        finally:
+            self._enabled.value = 0
+
+    def _receive(self):
+        while not self._stop.is_set():
+            if self.profiler: self.profiler.sync_thread()
+            self._enabled.value = bool(self.inference_enabled()) and not self._stop.is_set()
+            joints = self.overlay_joints()
+            if joints is not self._sent_joints:
+                self._sent_joints = joints
+                self._send(("joints", None if joints is None else np.asarray(joints).tolist()))
+            try:
+                if not self._conn.poll(0.1): continue
+                slot, seq, captured_at, inferred_at, inferred, landmarks, raw, timings, stats = self._conn.recv()
+            except (EOFError, OSError):
+                if not self._stop.is_set(): self.error = "pose process exited"
+                return
+            if self.metrics:
+                for stage, seconds in timings: self.metrics.record(stage, seconds)
+            if stats: self.worker_stats = stats
+            # perf_counter is a system-wide clock, so worker timestamps are comparable here
+            result = FrameResult(self._frames[slot], landmarks, inferred, captured_at, inferred_at, seq, raw)
+            with self._lock:
+                dropped, self._pending = self._pending, (result, slot)
+            if dropped:
+                self.dropped += 1
+                self._send(dropped[1])
+
+    def _send(self, message):
+        """Sends a freed slot index, or a ("joints", triplets) overlay update, to the worker."""
+        with self._send_lock:
+            try:
+                self._conn.send(message)
+            except (OSError, ValueError):
+                pass # The worker is gone
+
+    def latest_result(self):
+        """Returns the newest finished FrameResult, or None if nothing new is ready."""
+        with self._lock:
+            item, self._pending = self._pending, None
+        if item is None: return None
+        # The UI is done with the previous frame once it asks for the next one
+        if self._held is not None: self._send(self._held)
+        result, self._held = item
+        return result
+
+    def record_latency(self, result):
+        """Records capture-to-consumption latency for a result the UI has just applied."""
+        latency = time.perf_counter() - result.captured_at
+        self._latencies[self._latency_count % len(self._latencies)] = latency
+        self._latency_count += 1
+        return latency
+
+    def stats(self):
+        """Returns the worker's counters (and governor / keyframe stats), drops and end-to-end latency (ms)."""
+        n = min(self._latency_count, len(self._latencies))
+        window = sorted(self._latencies[:n])
+        return {
+            **self.worker_stats,
+            "dropped_before_display": self.dropped,
+            "latency_ms_avg": 1000 * sum(window) / n if n else 0.0,
+            "latency_ms_max": 1000 * window[-1] if n else 0.0,
+            "pose_process_alive": int(self._process is not None and self._process.is_alive()),
+        }
+
+
+def run_worker(conn, capture, detector_options, flip, landmark_filter, target_fps, enabled, stop):
+    """Body of the pose process: runs capture and FramePipeline.process, writing frames into the shared ring."""
+    import cv2
+    from tracker.pipeline import FramePipeline
+    from tracker.pose_detector import PoseDetector
+    from tracker.governor import InferenceGovernor
+
+    cap = shm = frames = pipeline = result = None
+    try:
+        try:
+            cap = capture() if capture else cv2.VideoCapture(0)
+            detector = PoseDetector(**detector_options)
+            detector.find_pose(np.zeros((480, 640, 3), dtype=np.uint8), draw=False)
+            success, frame = False, None
+            deadline = time.monotonic() + 5.0
+            while cap.isOpened() and not success and time.monotonic() < deadline:
+                success, frame = cap.read()
+                if not success: time.sleep(0.05)
+            if not success:
+                conn.send(("error", "Camera not available")); return
+        except Exception as e:
+            conn.send(("error", f"Could not start camera/pose model: {e}")); return
+        shape = frame.shape
+        conn.send(("ready", shape))
+        # Created and unlinked by the UI process (spawned children share its resource tracker)
+        shm = shared_memory.SharedMemory(name=conn.recv())
+        frames = np.ndarray((len(shm.buf) // frame.nbytes, *shape), dtype=np.uint8, buffer=shm.buf)
+        free = list(range(len(frames)))
+        overlay_joints = None
+
+        timings = StageTimings()
+        detector.metrics = timings
+        governor = InferenceGovernor(detector, target_fps) if target_fps else None
+        pipeline = FramePipeline(cap, detector, inference_enabled=lambda: bool(enabled.value), flip=flip,
+                                 metrics=timings, landmark_filter=landmark_filter, governor=governor,
+                                 overlay_joints=lambda: overlay_joints)
+        pipeline.start(inference_thread=False)
+        stats_due = 0.0
+        while not stop.is_set():
+            while conn.poll():
+                message = conn.recv()
+                if isinstance(message, tuple): overlay_joints = message[1]
+                else: free.append(message)
+            if not free:
+                conn.poll(0.05); continue
+            item = pipeline.capture_slot.take(timeout=0.1)
+            if item is None: continue
+            frame, captured_at, seq = item
+            if frame.shape != shape: frame = cv2.resize(frame, (shape[1], shape[0]))
+            slot = free.pop()
+            result = pipeline.process(frame, captured_at, seq, out=frames[slot])
+            stats = None
+            if time.monotonic() >= stats_due:
+                stats_due = time.monotonic() + 1.0
+                counters = pipeline.stats()
+                stats = {key: counters[key] for key in ("captured", "inferred", "read_failures", "dropped_before_inference")}
+                if governor: stats.update(governor.stats())
+                if detector.keyframes: stats.update(detector.keyframes.stats())
+            conn.send((slot, seq, captured_at, result.inferred_at, result.inferred, result.landmarks,
+                       result.raw_landmarks, timings.drain(), stats))
+    except (EOFError, OSError):
+        pass # The UI process went away
+    finally:
+        if pipeline: pipeline.close()
+        if cap: cap.release()
+        frames = result = None # Views into the ring must go before it can be closed
+        if shm: shm.close()
+        conn.close()
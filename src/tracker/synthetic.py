@@ -0,0 +1,111 @@
+import math
+import time
+
+import numpy as np
+
+# A rough standing pose in normalized image coordinates, indexed like MediaPipe's 33 pose landmarks
+STANDING_POSE = np.array([
+    (0.50, 0.15),                                              # 0 nose
+    (0.51, 0.13), (0.52, 0.13), (0.53, 0.13),                  # 1-3 left eye inner/eye/outer
+    (0.49, 0.13), (0.48, 0.13), (0.47, 0.13),                  # 4-6 right eye inner/eye/outer
+    (0.54, 0.14), (0.46, 0.14),                                # 7-8 ears
+    (0.51, 0.18), (0.49, 0.18),                                # 9-10 mouth
+    (0.58, 0.28), (0.42, 0.28),                                # 11-12 shoulders
+    (0.62, 0.42), (0.38, 0.42),                                # 13-14 elbows
+    (0.64, 0.55), (0.36, 0.55),                                # 15-16 wrists
+    (0.65, 0.58), (0.35, 0.58),                                # 17-18 pinkies
+    (0.645, 0.585), (0.355, 0.585),                            # 19-20 index fingers
+    (0.63, 0.57), (0.37, 0.57),                                # 21-22 thumbs
+    (0.55, 0.58), (0.45, 0.58),                                # 23-24 hips
+    (0.55, 0.75), (0.45, 0.75),                                # 25-26 knees
+    (0.55, 0.92), (0.45, 0.92),                                # 27-28 ankles
+    (0.555, 0.94), (0.445, 0.94),                              # 29-30 heels
+    (0.57, 0.95), (0.43, 0.95),                                # 31-32 foot index
+], dtype=np.float32)
+
+# Joints animated by default: right leg (squats) and right arm (curls / pushups)
+DEFAULT_JOINTS = ((24, 26, 28), (12, 14, 16))
+
+
+def synthetic_landmarks(frames, size=(640, 480), joints=DEFAULT_JOINTS, period=60, low=30.0, high=175.0):
+    """
+    Generates a (frames, 33, 4) float32 landmark stack in the PoseDetector.get_landmarks layout.
+    The angle of every (first, vertex, last) triplet in `joints` swings between `high` and `low`
+    degrees once per `period` frames, so every exercise's thresholds are crossed once per cycle.
+    """
+    w, h = size
+    base = np.zeros((33, 4), dtype=np.float32)
+    base[:, 0] = STANDING_POSE[:, 0] * w
+    base[:, 1] = STANDING_POSE[:, 1] * h
+    base[:, 3] = 0.99
+    out = np.repeat(base[None], frames, axis=0)
+    t = np.arange(frames)
+    angles = np.radians(low + (high - low) * (0.5 + 0.5 * np.cos(2 * math.pi * t / period)))
+    for a, b, c in joints:
+        ab = base[a, :2] - base[b, :2]
+        length = float(np.linalg.norm(base[c, :2] - base[b, :2]))
+        ab_angle = math.atan2(ab[1], ab[0])
+        # Put the last point `angle` degrees away from the first, measured around the vertex
+        out[:, c, 0] = base[b, 0] + length * np.cos(ab_angle + angles)
+        out[:, c, 1] = base[b, 1] + length * np.sin(ab_angle + angles)
+    return out
+
+
+def synthetic_frames(frames, size=(640, 480), **kwargs):
+    """Yields BGR frames of a moving stick figure drawn from synthetic_landmarks (a camera-free test clip)."""
+    import cv2
+    w, h = size
+    background = np.full((h, w, 3), 60, dtype=np.uint8)
+    segments = ((11, 12), (11, 23), (12, 24), (23, 24), (11, 13), (13, 15), (12, 14), (14, 16),
+                (23, 25), (25, 27), (24, 26), (26, 28))
+    for landmarks in synthetic_landmarks(frames, size, **kwargs):
+        frame = background.copy()
+        points = landmarks[:, :2].astype(np.int32)
+        for a, b in segments:
+            cv2.line(frame, tuple(points[a]), tuple(points[b]), (200, 200, 200), 12)
+        cv2.circle(frame, tuple(points[0]), 28, (180, 190, 220), -1)
+        yield frame
+
+
+class SyntheticCapture:
+    """
+    A camera stand-in for unattended runs: loops one exercise cycle of synthetic_frames forever,
+    paced to `fps`, with the cv2.VideoCapture methods the pipeline uses.
+    """
+    def __init__(self, size=(640, 480), fps=30.0, period=60, **kwargs):
+        self.fps = fps
+        self.size = size
+        self._frames = list(synthetic_frames(period, size, period=period, **kwargs))
+        self._index = 0
+        self._next_at = 0.0
+        self._open = True
+
+    def grab(self):
+        if not self._open: return False
+        if self.fps:
+            now = time.perf_counter()
+            if now < self._next_at: time.sleep(self._next_at - now)
+            self._next_at = max(now, self._next_at) + 1.0 / self.fps
+        return True
+
+    def retrieve(self):
+        if not self._open: return False, None
+        frame = self._frames[self._index].copy() # A real camera hands out a new buffer every frame
+        self._index = (self._index + 1) % len(self._frames)
+        return True, frame
+
+    def read(self):
+        return self.retrieve() if self.grab() else (False, None)
+
+    def isOpened(self):
+        return self._open
+
+    def get(self, prop):
+        import cv2
+        if prop == cv2.CAP_PROP_FPS: return float(self.fps or 0)
+        if prop == cv2.CAP_PROP_FRAME_WIDTH: return float(self.size[0])
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT: return float(self.size[1])
+        return 0.0
+
+    def release(self):
+        self._open = False
@@ -0,0 +1,94 @@
+import json
+import os
+import time
+
+import numpy as np
+
+# Same as pose_detector.NUM_LANDMARKS; defined here so replay never imports MediaPipe
+NUM_LANDMARKS = 33
+
+# A trace is a directory holding raw little-endian arrays that are appended frame by frame:
+#   landmarks.f32   float32, frames x 33 x 4 ([x_px, y_px, z, visibility]; NaN rows = no person)
+#   timestamps.f64  float64, one capture time (seconds) per frame
+#   meta.json       layout description and recording info
+LANDMARKS_FILE = "landmarks.f32"
+TIMESTAMPS_FILE = "timestamps.f64"
+META_FILE = "meta.json"
+FRAME_SHAPE = (NUM_LANDMARKS, 4)
+FRAME_BYTES = NUM_LANDMARKS * 4 * 4
+
+
+def is_trace(path):
+    return os.path.isfile(os.path.join(path, META_FILE))
+
+
+class TraceWriter:
+    """Appends a live landmark stream to an on-disk trace."""
+    def __init__(self, path, frame_size=None, **info):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.frames = 0
+        self._no_person = np.full(FRAME_SHAPE, np.nan, dtype=np.float32)
+        with open(os.path.join(path, META_FILE), 'w') as f:
+            json.dump({"version": 1, "dtype": "<f4", "frame_shape": list(FRAME_SHAPE),
+                       "channels": ["x", "y", "z", "visibility"], "frame_size": frame_size,
+                       "started_at": time.strftime("%Y-%m-%d %H:%M:%S"), **info}, f, indent=2)
+        self._landmarks = open(os.path.join(path, LANDMARKS_FILE), 'ab')
+        self._timestamps = open(os.path.join(path, TIMESTAMPS_FILE), 'ab')
+
+    def write(self, landmarks, timestamp):
+        """Appends one frame; `landmarks` is a (33, 4) array or None when no person was detected."""
+        frame = self._no_person if landmarks is None else np.asarray(landmarks, dtype='<f4')
+        frame.tofile(self._landmarks)
+        np.array(timestamp, dtype='<f8').tofile(self._timestamps)
+        self.frames += 1
+
+    def close(self):
+        if self._landmarks.closed: return
+        self._landmarks.close()
+        self._timestamps.close()
+
+
+class TraceReader:
+    """
+    Memory-maps a recorded trace for replay, so hours of landmarks load instantly.
+    A trace cut short by a crash is truncated to its last complete frame.
+    """
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, META_FILE)) as f:
+            self.meta = json.load(f)
+        lm_path = os.path.join(path, LANDMARKS_FILE)
+        ts_path = os.path.join(path, TIMESTAMPS_FILE)
+        n = min(os.path.getsize(lm_path) // FRAME_BYTES, os.path.getsize(ts_path) // 8)
+        if n:
+            self.landmarks = np.memmap(lm_path, dtype='<f4', mode='r', shape=(n,) + FRAME_SHAPE)
+            self.timestamps = np.memmap(ts_path, dtype='<f8', mode='r', shape=(n,))
+        else:
+            self.landmarks = np.empty((0,) + FRAME_SHAPE, dtype=np.float32)
+            self.timestamps = np.empty(0, dtype=np.float64)
+        # A frame counts as "person detected" when its first landmark isn't NaN
+        self.detected = ~np.isnan(self.landmarks[:, 0, 0])
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def __iter__(self):
+        """Yields (timestamp, landmarks) per frame, with landmarks None where nobody was detected."""
+        for i in range(len(self)):
+            yield self.timestamps[i], (self.landmarks[i] if self.detected[i] else None)
+
+
+def replay(reader, exercise, on_frame=None, landmark_filter=None):
+    """
+    Feeds a trace through `exercise.process_landmarks` exactly as the live loop would
+    (frames without a person are skipped), using the recorded timestamps so replays are deterministic. `on_frame(exercise)` is called after each processed frame.
+    Traces hold raw landmarks, so a `landmark_filter` can be applied (or swapped) at replay time.
+    Returns the exercise's final counter.
+    """
+    for timestamp, landmarks in reader:
+        if landmarks is None: continue
+        if landmark_filter: landmarks = landmark_filter(landmarks, float(timestamp))
+        exercise.process_landmarks(landmarks, float(timestamp))
+        if on_frame: on_frame(exercise)
+    return exercise.get_counter()
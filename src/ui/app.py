@@ -1,15 +1,20 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-import cv2
-from PIL import Image, ImageTk
-import csv
 import os
+import threading
+import time
 from datetime import datetime
 
-from tracker.pose_detector import PoseDetector
-from exercises.squats import Squats
-from exercises.curls import BicepCurls
-from exercises.pushups import Pushups
+# cv2, MediaPipe and PIL are imported lazily (see FitCountProApp.load_backend and
+# WorkoutScreen.start_video) so the first window paints before they load
+from tracker.trace import TraceWriter
+from perf.metrics import RuntimeMetrics, MetricsExporter
+from perf.startup import StartupTimer, STARTUP_LOG
+from perf.profiling import ProfileCapture
+from exercises.registry import create_exercises
+from storage.session_log import LOG_FILE, TIMESTAMP_FORMAT
+from storage.session_store import DB_FILE
+from storage.writer import SessionWriter
 
 # ===================================================================
 # STYLING AND CUSTOM WIDGETS
@@ -58,7 +63,9 @@ class HoverButton(tk.Button):
 # MAIN APPLICATION
 # ===================================================================
 class FitCountProApp(tk.Tk):
-    def __init__(self):
+    def __init__(self, record_trace_dir=None, metrics_file=None, metrics_interval=10.0, detector_options=None,
+                 display_fps=None, smoothing=None, target_fps=None, profile_seconds=10.0, capture=None, db_file=DB_FILE,
+                 pose_process=False, import_log=LOG_FILE, startup_log=STARTUP_LOG):
         super().__init__()
         self.title("FitCount Pro")
         self.geometry("1090x590")
@@ -71,17 +78,115 @@ class FitCountProApp(tk.Tk):
         self.current_plan_index = 0
         self.current_set_in_plan = 1
         self.session_data = []
-        self.cap = cv2.VideoCapture(0)
-        self.detector = PoseDetector()
-        self.exercises = {
-            "Bicep Curls": BicepCurls(), "Squats": Squats(), "Pushups": Pushups()
-        }
+        # Sets are persisted by a background writer as soon as they are logged
+        self.session_writer = SessionWriter(db_file)
+        # History used to live in an append-only CSV; bring it into the store once (import_log=None skips it)
+        if import_log and os.path.isfile(import_log): self.session_writer.import_csv(import_log)
+        self.display_fps = display_fps
+        self.record_trace_dir = record_trace_dir
+        self.trace_writer = None
+        self.metrics = RuntimeMetrics()
+        self.metrics_exporter = MetricsExporter(metrics_file, metrics_interval) if metrics_file else None
+        # startup_log=None keeps test runs out of the release startup history
+        self.startup = StartupTimer(startup_log)
+        # On-demand profiling: F9, or create logs/profile.trigger
+        self.profiler = ProfileCapture(profile_seconds)
+        # Camera, pose model and pipeline are created by load_backend on a background thread;
+        # `capture` opens a different frame source (a video, tracker.synthetic.SyntheticCapture) than camera 0
+        self.capture = capture
+        # Run capture and pose inference in their own process (tracker.shm_pipeline) instead of threads
+        self.pose_process = pose_process
+        self.detector_options = detector_options or {}
+        self.smoothing = smoothing
+        self.target_fps = target_fps
+        self.cap = None
+        self.detector = None
+        self.pipeline = None
+        self.backend_ready = threading.Event()
+        self.backend_error = None
+        self.closing = False
+        self.exercises = create_exercises()
         self.current_exercise = None
         self.container = tk.Frame(self, bg=COLOR_PRIMARY_BG)
         self.container.pack(fill="both", expand=True)
         self.frames = {}
         self.create_frames()
         self.show_frame("StartupScreen")
+        self.bind("<F3>", lambda e: self.frames["WorkoutScreen"].toggle_metrics_overlay())
+        self.bind("<F9>", lambda e: self.start_profile())
+        self.after_idle(self.on_first_paint)
+        self.after(1000, self.poll_profile_trigger)
+
+    def on_first_paint(self):
+        self.startup.mark("first_paint")
+        threading.Thread(target=self.load_backend, name="fitcount-backend", daemon=True).start()
+
+    def start_profile(self, seconds=None):
+        if self.profiler.start(seconds): self.on_profile_started()
+
+    def poll_profile_trigger(self):
+        if self.closing: return
+        if self.profiler.poll_trigger(): self.on_profile_started()
+        self.after(1000, self.poll_profile_trigger)
+
+    def on_profile_started(self):
+        self.title("FitCount Pro - profiling...")
+        self.after(int(self.profiler.duration * 1000), self.stop_profile)
+
+    def stop_profile(self):
+        self.profiler.stop()
+        self.title("FitCount Pro")
+
+    def load_backend(self):
+        """
+        Opens the camera and loads + warms up the pose model off the Tk thread.
+        Must not touch Tk widgets; the UI polls `backend_ready` instead.
+        """
+        try:
+            from tracker.filters import make_filter
+            inference_enabled = lambda: self.is_running and self.current_exercise is not None
+            overlay_joints = lambda: self.current_exercise.joints if self.current_exercise is not None else None
+            if self.pose_process:
+                from tracker.shm_pipeline import ProcessPipeline
+                pipeline = ProcessPipeline(self.capture, self.detector_options, inference_enabled=inference_enabled,
+                                           metrics=self.metrics, landmark_filter=make_filter(self.smoothing),
+                                           target_fps=self.target_fps, profiler=self.profiler,
+                                           overlay_joints=overlay_joints)
+                self.backend_error = pipeline.open()
+                if self.closing or self.backend_error:
+                    pipeline.close(); return
+                self.metrics.add_source(pipeline.stats)
+                self.pipeline = pipeline
+                return
+
+            import cv2
+            import numpy as np
+            from tracker.pose_detector import PoseDetector
+            from tracker.pipeline import FramePipeline
+            from tracker.governor import InferenceGovernor
+
+            cap = self.capture() if self.capture else cv2.VideoCapture(0)
+            detector = PoseDetector(**self.detector_options)
+            # The first inference initialises the model graph; pay for it before the user starts a workout
+            detector.find_pose(np.zeros((480, 640, 3), dtype=np.uint8), draw=False)
+            detector.metrics = self.metrics
+            governor = InferenceGovernor(detector, self.target_fps) if self.target_fps else None
+            pipeline = FramePipeline(cap, detector,
+                                     inference_enabled=inference_enabled,
+                                     metrics=self.metrics, landmark_filter=make_filter(self.smoothing),
+                                     governor=governor, profiler=self.profiler, overlay_joints=overlay_joints)
+            if governor: self.metrics.add_source(governor.stats)
+            if detector.keyframes: self.metrics.add_source(detector.keyframes.stats)
+            self.metrics.add_source(pipeline.stats)
+            if self.closing:
+                cap.release(); return
+            self.cap, self.detector, self.pipeline = cap, detector, pipeline
+            if not cap.isOpened(): self.backend_error = "Camera not available"
+        except Exception as e:
+            self.backend_error = f"Could not start camera/pose model: {e}"
+        finally:
+            self.startup.mark("backend_ready")
+            self.backend_ready.set()
 
     def setup_styles(self):
         """Configures the styles for ttk widgets."""
@@ -137,7 +242,11 @@ class FitCountProApp(tk.Tk):
             return
         self.is_running = True
         self.session_data = []
+        self.session_writer.start_session()
         self.current_plan_index = -1
+        if self.record_trace_dir:
+            self.trace_writer = TraceWriter(os.path.join(self.record_trace_dir, datetime.now().strftime("%Y%m%d-%H%M%S")),
+                                            plan=self.workout_plan)
         self.load_next_exercise()
         self.show_frame("WorkoutScreen")
     def load_next_exercise(self):
@@ -153,31 +262,51 @@ class FitCountProApp(tk.Tk):
         self.frames["WorkoutScreen"].update_exercise_info()
     def end_workout(self):
         self.is_running = False
+        self.close_trace()
         self.save_session_log()
         self.show_summary()
         self.show_frame("StartupScreen")
+    def close_trace(self):
+        if self.trace_writer:
+            self.trace_writer.close()
+            self.trace_writer = None
     def on_closing(self):
-        self.cap.release()
+        if self.closing: return
+        self.closing = True
+        self.withdraw()
+        self.close_trace()
+        if self.is_running: self.session_writer.end_session()
+        # Joining the capture/inference threads and flushing the writer can take seconds; keep Tk responsive meanwhile
+        shutdown = threading.Thread(target=self.shutdown_backend, name="fitcount-shutdown", daemon=True)
+        shutdown.start()
+        self.finish_closing(shutdown)
+    def shutdown_backend(self):
+        if self.pipeline: self.pipeline.close()
+        self.session_writer.close()
+        if self.cap: self.cap.release()
+    def finish_closing(self, shutdown):
+        if shutdown.is_alive(): self.after(50, self.finish_closing, shutdown); return
+        if self.session_writer.error: messagebox.showerror("Workout data not saved", self.session_writer.error)
         self.destroy()
     def log_current_set(self):
         if not self.current_exercise or self.current_exercise.get_counter() == 0: return
         plan_item = self.workout_plan[self.current_plan_index]
-        self.session_data.append({
-            "Timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        row = {
+            "Timestamp": datetime.now().strftime(TIMESTAMP_FORMAT),
             "Exercise": plan_item["exercise"],
             "Set": self.current_set_in_plan,
             "Reps": self.current_exercise.get_counter()
-        })
+        }
+        metrics = self.current_exercise.set_metrics()
+        if metrics:
+            row.update({"TUT": round(metrics["tut_s"], 2), "Concentric": round(metrics["concentric_s"], 2),
+                        "Eccentric": round(metrics["eccentric_s"], 2), "Min Angle": round(metrics["min_angle"], 1),
+                        "Max Angle": round(metrics["max_angle"], 1)})
+        self.session_data.append(row)
+        self.session_writer.add_set(row)
     def save_session_log(self):
-        if not self.session_data: return
-        log_dir = 'logs'; log_file = os.path.join(log_dir, 'session_log.csv')
-        os.makedirs(log_dir, exist_ok=True)
-        file_exists = os.path.isfile(log_file)
-        with open(log_file, 'a', newline='') as f:
-            fieldnames = ["Timestamp", "Exercise", "Set", "Reps"]
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            if not file_exists: writer.writeheader()
-            writer.writerows(self.session_data)
+        # Every set is already queued for the writer; this just closes the session
+        self.session_writer.end_session()
     def show_summary(self):
         if not self.session_data:
             messagebox.showinfo("Session Over", "No workout data was recorded.")
@@ -185,9 +314,12 @@ class FitCountProApp(tk.Tk):
         summary_text = "Session Summary:\n\n"
         total_reps = 0
         for entry in self.session_data:
-            summary_text += f"- {entry['Exercise']} | Set {entry['Set']}: {entry['Reps']} reps\n"
+            summary_text += f"- {entry['Exercise']} | Set {entry['Set']}: {entry['Reps']} reps"
+            if "TUT" in entry: summary_text += f" ({entry['TUT']:.0f}s under tension)"
+            summary_text += "\n"
             total_reps += entry['Reps']
         summary_text += f"\nGreat work! You completed a total of {total_reps} reps."
+        if self.session_writer.error: summary_text += f"\n\nWarning: {self.session_writer.error}"
         messagebox.showinfo("Session Over", summary_text)
 
 # ===================================================================
@@ -310,8 +442,10 @@ class WorkoutScreen(tk.Frame):
         # Video Frame
         video_frame = tk.Frame(self, bg="black")
         video_frame.grid(row=0, column=0, sticky="nsew", padx=(10,5), pady=10)
-        self.video_label = tk.Label(video_frame, bg="black")
+        video_frame.pack_propagate(False) # The video is scaled to fit; it must not resize the layout
+        self.video_label = tk.Label(video_frame, bg="black", fg=COLOR_TEXT, font=FONT_NORMAL)
         self.video_label.pack(fill=tk.BOTH, expand=True)
+        self.renderer = None # Created on first start_video, which is when PIL/cv2 are first needed
 
         # Control Panel Frame
         control_frame = tk.Frame(self, bg=COLOR_SECONDARY_BG)
@@ -333,6 +467,20 @@ class WorkoutScreen(tk.Frame):
         
         self.stage_label = tk.Label(panel_container, text="STAGE: -", font=("Segoe UI", 16), fg=COLOR_TEXT, bg=COLOR_SECONDARY_BG)
         self.stage_label.pack(pady=20)
+
+        # Tempo and range of motion of the last rep, and time under tension for the set
+        self.tempo_label = tk.Label(panel_container, text="", font=FONT_NORMAL, justify="center", fg=COLOR_TEXT, bg=COLOR_SECONDARY_BG)
+        self.tempo_label.pack(pady=(0, 10))
+
+        # Shown while the session writer can't save sets
+        self.save_error_label = tk.Label(panel_container, text="", font=FONT_NORMAL, wraplength=240, justify="center",
+                                         fg=COLOR_DANGER, bg=COLOR_SECONDARY_BG)
+        self.save_error_label.pack(pady=(0, 10))
+
+        # Runtime metrics overlay, toggled with F3
+        self.metrics_label = tk.Label(panel_container, text="", font=("Consolas", 9), justify="left", fg=COLOR_TEXT, bg=COLOR_SECONDARY_BG)
+        self.metrics_visible = False
+        self._metrics_refresh_at = 0.0
         
         # Another sub-frame for the buttons at the bottom
         button_frame = tk.Frame(panel_container, bg=COLOR_SECONDARY_BG)
@@ -345,25 +493,52 @@ class WorkoutScreen(tk.Frame):
         end_button.pack(fill='x')
 
     def update_frame(self):
-        if not self.video_loop_active: return
-        success, frame = self.controller.cap.read()
-        if success:
-            frame = cv2.flip(frame, 1)
+        if not self.video_loop_active or self.controller.closing: return
+        if not self.controller.pipeline:
+            # Backend still loading (or failed) - check again shortly
+            self.video_label.config(text=self.controller.backend_error or "Starting camera...")
+            self.after(50, self.update_frame); return
+        if not self.controller.pipeline.is_running():
+            self.controller.pipeline.start()
+            # e.g. the pose process died; drawn over the last frame
+            error = self.controller.backend_error or self.controller.pipeline.error
+            self.video_label.config(text=error or "", compound="center")
+        metrics = self.controller.metrics
+        result = self.controller.pipeline.latest_result()
+        if result is not None:
+            self.controller.startup.mark("first_frame")
+            if result.inferred: self.controller.startup.mark("first_inference")
+            frame = result.frame
+            detected = True
             if self.controller.is_running and self.controller.current_exercise:
-                frame = self.controller.detector.find_pose(frame, draw=True)
-                landmarks = self.controller.detector.get_landmarks(frame)
-                if landmarks:
+                start = time.perf_counter()
+                landmarks = result.landmarks
+                detected = landmarks is not None
+                if self.controller.trace_writer: self.controller.trace_writer.write(result.raw_landmarks, result.captured_at)
+                if landmarks is not None:
                     prev_reps = self.controller.current_exercise.get_counter()
-                    self.controller.current_exercise.process_landmarks(landmarks)
+                    self.controller.current_exercise.process_landmarks(landmarks, result.captured_at)
                     new_reps = self.controller.current_exercise.get_counter()
                     target_reps = self.controller.workout_plan[self.controller.current_plan_index]['reps']
                     if new_reps > prev_reps and new_reps >= target_reps: self.next_set()
                 self.update_exercise_info()
-            img = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            img_tk = ImageTk.PhotoImage(image=Image.fromarray(img))
-            self.video_label.imgtk = img_tk
-            self.video_label.configure(image=img_tk)
+                metrics.record("logic", time.perf_counter() - start)
+            self.controller.pipeline.record_latency(result)
+            start = time.perf_counter()
+            if self.renderer.render(frame): metrics.record("render", time.perf_counter() - start)
+            metrics.frame_done(detected)
+            self.refresh_metrics()
         self.after(10, self.update_frame)
+    def refresh_metrics(self):
+        if self.controller.metrics_exporter: self.controller.metrics_exporter.maybe_export(self.controller.metrics)
+        now = time.monotonic()
+        if self.metrics_visible and now >= self._metrics_refresh_at:
+            self._metrics_refresh_at = now + 0.5
+            self.metrics_label.config(text=self.controller.metrics.overlay_text())
+    def toggle_metrics_overlay(self):
+        self.metrics_visible = not self.metrics_visible
+        if self.metrics_visible: self.metrics_label.pack(before=self.stage_label, pady=(0, 10))
+        else: self.metrics_label.pack_forget()
     def next_set(self):
         self.controller.log_current_set()
         plan_item = self.controller.workout_plan[self.controller.current_plan_index]
@@ -380,10 +555,22 @@ class WorkoutScreen(tk.Frame):
         self.reps_label.config(text=f"{self.controller.current_exercise.get_counter()} / {plan_item['reps']}")
         self.sets_label.config(text=f"Set {self.controller.current_set_in_plan} of {plan_item['sets']}")
         self.stage_label.config(text=f"STAGE: {self.controller.current_exercise.get_stage()}")
+        rep, totals = self.controller.current_exercise.rep_metrics(), self.controller.current_exercise.set_metrics()
+        self.tempo_label.config(text="" if rep is None else
+                                f"Last rep: up {rep['concentric_s']:.1f}s / down {rep['eccentric_s']:.1f}s\n"
+                                f"ROM {rep['min_angle']:.0f}°-{rep['max_angle']:.0f}°   TUT {totals['tut_s']:.1f}s")
+        error = self.controller.session_writer.error
+        if error != self.save_error_label.cget("text"): self.save_error_label.config(text=error or "")
     def confirm_end_workout(self):
         if messagebox.askyesno("Confirm", "Are you sure you want to end this workout?"):
             self.controller.end_workout()
     def start_video(self):
-        if not self.video_loop_active: self.video_loop_active = True; self.update_frame()
+        if not self.video_loop_active:
+            if self.renderer is None:
+                from ui.video_renderer import VideoRenderer
+                self.renderer = VideoRenderer(self.video_label, max_fps=self.controller.display_fps)
+            self.video_loop_active = True
+            self.update_frame()
     def stop_video(self):
-        self.video_loop_active = False
\ No newline at end of file
+        self.video_loop_active = False
+        if self.controller.pipeline: self.controller.pipeline.stop()
\ No newline at end of file
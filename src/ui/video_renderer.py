@@ -0,0 +1,76 @@
+import time
+
+import cv2
+import numpy as np
+from PIL import Image, ImageTk
+
+
+class VideoRenderer:
+    """
+    Draws RGB frames into a Tk label without per-frame allocations.
+
+    One PhotoImage, one PIL image and one scaled frame buffer are kept and updated in place;
+    they are only rebuilt when the label changes size. Frames are scaled to fit the label,
+    rendering is skipped while the label isn't visible, and `max_fps` caps the display rate
+    independently of how fast inference produces frames.
+    """
+    def __init__(self, label, max_fps=None):
+        self.label = label
+        self.max_fps = max_fps
+        self._photo = None
+        self._image = None
+        self._buffer = None
+        self._source_shape = None
+        self._label_size = None
+        self._interpolation = cv2.INTER_AREA
+        self._next_render_at = 0.0
+        self.rendered = 0
+        self.skipped = 0
+
+    def should_render(self, now=None):
+        """False while the label is hidden or when the display frame-rate cap says to skip this frame."""
+        if not self.label.winfo_viewable():
+            return False
+        if self.max_fps:
+            now = time.perf_counter() if now is None else now
+            if now < self._next_render_at:
+                return False
+            self._next_render_at = now + 1.0 / self.max_fps
+        return True
+
+    def render(self, frame):
+        """Shows an RGB frame; returns False if it was skipped."""
+        if not self.should_render():
+            self.skipped += 1
+            return False
+        self._ensure_buffers(frame.shape)
+        if self._buffer.shape[:2] == frame.shape[:2]:
+            pixels = frame
+        else:
+            pixels = cv2.resize(frame, (self._buffer.shape[1], self._buffer.shape[0]), dst=self._buffer,
+                                interpolation=self._interpolation)
+        self._image.frombytes(pixels)
+        self._photo.paste(self._image)
+        self.rendered += 1
+        return True
+
+    def _ensure_buffers(self, shape):
+        label_size = (self.label.winfo_width(), self.label.winfo_height())
+        if self._photo is not None and shape == self._source_shape and label_size == self._label_size:
+            return
+        self._source_shape, self._label_size = shape, label_size
+        h, w = shape[:2]
+        lw, lh = label_size
+        if lw <= 1 or lh <= 1:
+            # Not laid out yet - show the frame at its own size
+            lw, lh = w, h
+        scale = min(lw / w, lh / h)
+        size = (max(1, int(w * scale)), max(1, int(h * scale)))
+        self._interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR
+        if self._image is not None and self._image.size == size:
+            return
+        self._buffer = np.empty((size[1], size[0], 3), dtype=np.uint8)
+        self._image = Image.new("RGB", size)
+        self._photo = ImageTk.PhotoImage(image=self._image)
+        self.label.configure(image=self._photo)
+        self.label.imgtk = self._photo
@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+
+from exercises.catalog import CATALOG, DEFINITIONS
+from exercises.engine import NO_PERSON, RuleExercise
+from exercises.registry import EXERCISES
+
+FPS = 30.0
+NAMES = [definition["name"] for definition in CATALOG]
+
+
+def pose(joints, angles):
+    """A (33, 4) landmark array in which each (first, vertex, last) triplet of `joints` forms the given angle."""
+    landmarks = np.zeros((33, 4), dtype=np.float32)
+    landmarks[:, 3] = 1.0
+    for (first, vertex, last), angle in zip(joints, angles):
+        rad = np.radians(angle)
+        landmarks[vertex, :2] = (200, 200)
+        landmarks[first, :2] = (200, 100)
+        landmarks[last, :2] = (200 + 100 * np.sin(rad), 200 - 100 * np.cos(rad))
+        if np.isnan(angle): landmarks[last, :2] = np.nan
+    return landmarks
+
+
+def feed(exercise, angles, start=0.0):
+    """Plays one angle per frame at FPS (on every joint of the exercise); returns the time after the last frame."""
+    t = start
+    for angle in angles:
+        exercise.process_landmarks(pose(exercise.joints, [angle] * len(exercise.joints)), t)
+        t += 1 / FPS
+    return t
+
+
+def rep(definition, frames=10):
+    """Angles of one clean rep: from rest past `exit`, down past `enter`, and back."""
+    rest, deep = definition["exit"] + 10, definition["enter"] - 10
+    return list(np.linspace(rest, deep, frames)) + list(np.linspace(deep, rest, frames))
+
+
+@pytest.mark.parametrize("name", NAMES)
+def test_counts_clean_reps(name):
+    exercise = EXERCISES[name]()
+    definition = DEFINITIONS[name]
+    rest_stage, active_stage = definition["stages"]
+    t = feed(exercise, [definition["exit"] + 10] * 5)
+    assert exercise.get_stage() == rest_stage
+    t = feed(exercise, rep(definition) * 3, t)
+    assert exercise.get_counter() == 3
+    assert exercise.get_stage() == rest_stage
+    metrics = exercise.set_metrics()
+    assert metrics["min_angle"] == pytest.approx(definition["enter"] - 10, abs=0.5)
+    assert metrics["max_angle"] == pytest.approx(definition["exit"] + 10, abs=0.5)
+    feed(exercise, [definition["enter"] - 10], t)
+    assert exercise.get_stage() == active_stage
+
+
+@pytest.mark.parametrize("name", NAMES)
+def test_hysteresis_band(name):
+    exercise = EXERCISES[name]()
+    definition = DEFINITIONS[name]
+    enter, exit_ = definition["enter"], definition["exit"]
+    middle = (enter + exit_) / 2
+    # Moving inside the band, up to just short of either threshold, never counts
+    t = feed(exercise, [exit_ + 10, middle, enter + 1, middle, exit_ - 1, middle] * 3)
+    assert exercise.get_counter() == 0
+    # Past `enter`, bouncing back into the band is still the same rep
+    t = feed(exercise, [enter - 5, middle, enter - 5, middle, exit_ - 1], t)
+    assert exercise.get_counter() == 0
+    feed(exercise, [exit_ + 5], t)
+    assert exercise.get_counter() == 1
+
+
+@pytest.mark.parametrize("name", NAMES)
+def test_min_dwell_debounces_threshold_jitter(name):
+    definition = DEFINITIONS[name]
+    rest, deep = definition["exit"] + 10, definition["enter"] - 10
+    # A rep, then a single-frame dip past `enter` right after it (e.g. a landmark glitch), then rest
+    frames = rep(definition) + [deep] + [rest] * 30
+    without = RuleExercise.from_definition({**definition, "min_dwell": 0.0})
+    feed(without, frames)
+    assert without.get_counter() == 2
+    debounced = RuleExercise.from_definition({**definition, "min_dwell": 0.2})
+    t = feed(debounced, frames)
+    assert debounced.get_counter() == 1
+    # Once the stage has lasted min_dwell, a real rep is counted again
+    feed(debounced, rep(definition, frames=15), t)
+    assert debounced.get_counter() == 2
+
+
+def test_no_person_and_unmeasured_side():
+    definition = {**DEFINITIONS["Bicep Curls"], "side": "either"}
+    exercise = RuleExercise.from_definition(definition)
+    exercise.process_landmarks(None, 0.0)
+    assert exercise.get_stage() == NO_PERSON
+    # The left arm is out of view (NaN angles); the right arm alone drives the count and the analytics
+    t = 0.0
+    for angle in rep(definition) * 2:
+        exercise.process_landmarks(pose(exercise.joints, [angle, np.nan]), t)
+        t += 1 / FPS
+    assert exercise.get_counter() == 2
+    assert np.isfinite(list(exercise.rep_metrics().values())).all()
@@ -0,0 +1,49 @@
+import types
+
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+
+from exercises.registry import create_exercises
+from tracker.keyframes import KeyframePropagator
+from tracker.synthetic import synthetic_frames, synthetic_landmarks
+
+SIZE = (640, 480)
+FRAMES = 600 # 10 reps of every exercise at the default period
+
+
+def model_results(landmarks):
+    """What the pose model would return for a frame: the clip's true landmarks, normalized, in MediaPipe's shape."""
+    w, h = SIZE
+    return types.SimpleNamespace(pose_landmarks=types.SimpleNamespace(landmark=[
+        types.SimpleNamespace(x=float(x) / w, y=float(y) / h, z=0.0, visibility=float(v)) for x, y, _, v in landmarks]))
+
+
+def replay(keyframes):
+    """
+    Runs the synthetic clip the way PoseDetector.find_pose does, with the true landmarks standing in
+    for the model; returns ({exercise: reps}, share of frames the model ran on).
+    """
+    w, h = SIZE
+    exercises = create_exercises()
+    propagator = KeyframePropagator() if keyframes else None
+    results, model_runs = None, 0
+    for t, (frame, truth) in enumerate(zip(synthetic_frames(FRAMES, SIZE), synthetic_landmarks(FRAMES, SIZE))):
+        if propagator is None or results is None or not propagator.propagate(frame, results):
+            results = model_results(truth)
+            model_runs += 1
+            if propagator: propagator.keyframe(frame, results)
+        landmarks = np.array([(lm.x * w, lm.y * h, lm.z, lm.visibility) for lm in results.pose_landmarks.landmark],
+                             dtype=np.float32)
+        next(iter(exercises.values())).process_landmarks(landmarks, t / 30) # One engine evaluates them all
+    return {name: exercise.get_counter() for name, exercise in exercises.items()}, model_runs / FRAMES
+
+
+def test_keyframes_count_the_same_reps_with_fewer_model_runs():
+    every_frame, share = replay(keyframes=False)
+    assert share == 1.0
+    assert all(count == 10 for count in every_frame.values()), every_frame
+    propagated, share = replay(keyframes=True)
+    assert propagated == every_frame
+    assert share < 0.75 # about half on this clip
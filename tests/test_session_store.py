@@ -0,0 +1,75 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+from storage.session_store import SessionStore
+from storage.writer import SessionWriter
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+# Records a session through the write-behind writer and reports each set once it is on disk
+RECORDER = textwrap.dedent("""
+    import sys, time
+    from storage.writer import SessionWriter
+    writer = SessionWriter(sys.argv[1], flush_interval=0.01)
+    writer.start_session()
+    for i in range(1, 1001):
+        writer.add_set({"Timestamp": f"2026-01-0{1 + i % 2} 10:00:00", "Exercise": "Squats", "Set": i, "Reps": 10})
+        while writer.written < i: time.sleep(0.001)
+        print(i, flush=True)
+""")
+
+
+def record_and_kill(path, sets):
+    """Starts a recorder process and kills it (SIGKILL / TerminateProcess) once `sets` sets are committed."""
+    proc = subprocess.Popen([sys.executable, "-c", RECORDER, path], stdout=subprocess.PIPE, text=True,
+                            env={**os.environ, "PYTHONPATH": SRC})
+    for line in proc.stdout:
+        if int(line) >= sets: break
+    proc.kill()
+    proc.wait()
+    proc.stdout.close()
+    return proc.pid
+
+
+def test_killed_session_stays_consistent_and_is_recovered(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    record_and_kill(path, 25)
+
+    store = SessionStore(path)
+    assert store.check() == []
+    [killed] = store.open_sessions()
+    committed = store.conn.execute("SELECT COUNT(*) FROM sets WHERE session_id = ?", (killed,)).fetchone()[0]
+    assert committed >= 25
+    store.close()
+
+    # The next writer closes the dead session at its last set; sets and daily totals still agree
+    writer = SessionWriter(path)
+    writer.close()
+    assert writer.recovered == 1
+    store = SessionStore(path)
+    assert store.check() == []
+    assert store.open_sessions() == []
+    ended_at, = store.conn.execute("SELECT ended_at FROM sessions WHERE id = ?", (killed,)).fetchone()
+    assert ended_at == store.conn.execute("SELECT MAX(timestamp) FROM sets").fetchone()[0]
+    totals = store.conn.execute("SELECT SUM(sets), SUM(reps) FROM daily_totals").fetchone()
+    assert tuple(totals) == (committed, 10 * committed)
+    store.close()
+
+
+def test_recovery_leaves_live_sessions_alone(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    store = SessionStore(path)
+    live = store.start_session("2026-01-01 10:00:00") # recorded by this (running) process
+    store.add_sets(live, [{"Timestamp": "2026-01-01 10:01:00", "Exercise": "Squats", "Set": 1, "Reps": 8}])
+    legacy = store.conn.execute("INSERT INTO sessions (started_at) VALUES ('2025-12-31 10:00:00')").lastrowid
+    store.conn.commit()
+    store.close()
+
+    writer = SessionWriter(path)
+    writer.close()
+    store = SessionStore(path)
+    assert store.open_sessions() == [live]
+    assert store.conn.execute("SELECT 1 FROM sessions WHERE id = ?", (legacy,)).fetchone() is None
+    store.close()